@@ -5,11 +5,15 @@ set -o errexit
 # Modify this line as needed for your package manager (pip, poetry, etc.)
 pip install -r requirements.txt
 
-# Apply any outstanding database migrations
-python manage.py migrate pierrpgd zero
-rm -rf pierrpgd/migrations/
-python manage.py makemigrations
-python manage.py makemigrations pierrpgd
+# Apply any outstanding database migrations (committed in pierrpgd/migrations/)
+# Fail if the models have changes without a migration, or if a migration drops data
+# MIGRATION_ALLOW : migrations destructives voulues, séparées par des espaces (ex. "pierrpgd.0005_remove_project_url")
+python manage.py makemigrations --check --dry-run
+allow_args=()
+for migration in $MIGRATION_ALLOW; do
+  allow_args+=(--allow "$migration")
+done
+python manage.py check_migrations "${allow_args[@]}"
 python manage.py migrate
 
 # Create superuser if CREATE_SUPERUSER is set
@@ -18,8 +22,8 @@ if [[ $CREATE_SUPERUSER ]]; then
 fi
 
 if [[ $INIT_DB ]]; then
-  # Initiate database for 'pierrpgd' user
-  python manage.py init_db --force
+  # Initiate database for 'pierrpgd' user, only writing what changed since the last deploy
+  python manage.py init_db --upsert
 fi
 
 # Convert static asset files
@@ -0,0 +1,326 @@
+from django.utils import timezone
+from .models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
+from .signals import last_orders, skill_profile_ids, touch_profiles
+from .snapshots import rebuild_snapshots
+import itertools
+
+OPERATIONS = ('create', 'update', 'delete')
+
+# Modèles et champs modifiables par type d'élément
+MODELS = {
+    'profile': Profile,
+    'about': About,
+    'experience': Experience,
+    'education': Education,
+    'project': Project,
+    'skill': Skill,
+    'color': Color,
+}
+FIELDS = {
+    'profile': ('identifiant', 'name', 'title'),
+    'about': ('content',),
+    'experience': ('dates', 'position', 'company', 'location', 'description', 'details', 'url'),
+    'education': ('dates', 'title', 'institution', 'location', 'field', 'description', 'details', 'url'),
+    'project': ('title', 'description', 'details', 'image_url', 'url'),
+    'skill': ('category', 'name'),
+    'color': ('red', 'green', 'blue', 'transparency'),
+}
+DEFAULTS = {
+    'color': {'red': 0, 'green': 0, 'blue': 0, 'transparency': 100},
+}
+SKILLED_TYPES = ('experience', 'education', 'project')
+
+class BatchError(Exception):
+    """Erreur sur une opération d'un lot, identifiée par sa position"""
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+def parse_operations(operations):
+    """Valide la forme des opérations et les renvoie indexées par position"""
+    if not isinstance(operations, list) or not operations:
+        raise BatchError(None, 'Liste d\'opérations manquante')
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise BatchError(index, 'Opération invalide')
+        op = operation.get('op')
+        type = operation.get('type')
+        data = operation.get('data', {})
+        if op not in OPERATIONS:
+            raise BatchError(index, f'Opération inconnue : {op}')
+        if type not in MODELS:
+            raise BatchError(index, f'Type inconnu : {type}')
+        if not isinstance(data, dict):
+            raise BatchError(index, 'Données invalides')
+        if op != 'create':
+            if not data.get('id'):
+                raise BatchError(index, 'ID manquant')
+            try:
+                data = dict(data, id=int(data['id']))
+            except (TypeError, ValueError):
+                raise BatchError(index, 'ID invalide')
+        if type == 'profile' and ' ' in data.get('identifiant', ''):
+            raise BatchError(index, 'L\'identifiant ne doit pas contenir d\'espace')
+        if 'skills' in data:
+            if not isinstance(data['skills'], list):
+                raise BatchError(index, 'Compétences invalides')
+            try:
+                data = dict(data, skills=[int(skill_id) for skill_id in data['skills']])
+            except (TypeError, ValueError):
+                raise BatchError(index, 'ID de compétence invalide')
+        if 'level' in data:
+            try:
+                data = dict(data, level=int(data['level']))
+            except (TypeError, ValueError):
+                raise BatchError(index, 'Niveau invalide')
+        parsed.append((index, op, type, data))
+    return parsed
+
+class Batch:
+    """Applique un lot d'opérations dans l'ordre, avec des requêtes groupées par modèle
+
+    Les opérations consécutives de même nature (op, type) sont appliquées ensemble :
+    le lot produit le même résultat que ses opérations envoyées une à une.
+    Les écritures groupées ne déclenchent pas les signaux : l'ordre des nouveaux
+    éléments, la version des profils et les snapshots sont gérés ici.
+    """
+
+    def __init__(self, operations):
+        self.operations = parse_operations(operations)
+        self.results = [None] * len(self.operations)
+        self.touched = set()
+        self.profiles = {}
+
+    def run(self):
+        for (op, type), operations in itertools.groupby(self.operations, key=lambda operation: operation[1:3]):
+            self.apply(op, type, list(operations))
+
+        touch_profiles(self.touched)
+        rebuild_snapshots(self.touched)
+        return self.results
+
+    def apply(self, op, type, operations):
+        """Applique une suite d'opérations consécutives de même nature"""
+        if op == 'create' and type == 'profile':
+            self.create_profiles(operations)
+            return
+        self.load_profiles(operations)
+        if type == 'skill':
+            if op == 'delete':
+                self.delete_skills(operations)
+            else:
+                self.save_skills(operations)
+        elif op == 'create':
+            self.create_items(type, operations)
+        elif op == 'update':
+            self.update_items(type, operations)
+        else:
+            self.delete_items(type, operations)
+
+    def result(self, index, op, type, obj_id):
+        self.results[index] = {'success': True, 'op': op, 'type': type, 'id': obj_id}
+
+    def load_profiles(self, operations):
+        """Charge les profils référencés par leur identifiant qui ne sont pas encore connus"""
+        identifiants = {
+            data['profile'] for _, op, type, data in operations
+            if data.get('profile') and (type == 'skill' or (op == 'create' and type != 'profile'))
+        } - set(self.profiles)
+        if not identifiants:
+            return
+        for profile in Profile.objects.filter(identifiant__in=identifiants):
+            self.profiles[profile.identifiant] = profile
+
+    def profile_for(self, index, data):
+        profile = self.profiles.get(data.get('profile'))
+        if profile is None:
+            raise BatchError(index, 'Profil introuvable' if data.get('profile') else 'Profile ID manquant')
+        return profile
+
+    def values(self, type, data):
+        values = dict(DEFAULTS.get(type, {}))
+        values.update({field: data[field] for field in FIELDS[type] if field in data})
+        return values
+
+    def fetch(self, type, operations):
+        """Objets visés par des opérations de mise à jour ou de suppression, en une requête"""
+        objects = MODELS[type].objects.in_bulk([data['id'] for _, _, _, data in operations])
+        for index, _, _, data in operations:
+            if data['id'] not in objects:
+                raise BatchError(index, f'{type} introuvable')
+        return objects
+
+    def forget_profiles(self, profile_ids):
+        self.profiles = {identifiant: profile for identifiant, profile in self.profiles.items() if profile.id not in profile_ids}
+
+    def create_profiles(self, operations):
+        for index, op, type, data in operations:
+            # Création unitaire : la palette par défaut est créée par signal
+            profile = Profile.objects.create(**self.values(type, data))
+            self.profiles[profile.identifiant] = profile
+            self.touched.add(profile.id)
+            self.result(index, op, type, profile.id)
+
+    def create_items(self, type, operations):
+        if not operations:
+            return
+        model = MODELS[type]
+        objs = []
+        for index, op, _, data in operations:
+            profile = self.profile_for(index, data)
+            objs.append(model(profile=profile, **self.values(type, data)))
+
+        # Ordre : à la suite des éléments existants de chaque profil (profils verrouillés, comme assign_order)
+        next_order = {
+            profile_id: max_order + 1
+            for profile_id, max_order in last_orders(model, {obj.profile_id for obj in objs}).items()
+        }
+        for obj in objs:
+            obj.order = next_order.get(obj.profile_id, 0)
+            next_order[obj.profile_id] = obj.order + 1
+
+        model.objects.bulk_create(objs)
+        for (index, op, _, data), obj in zip(operations, objs):
+            self.touched.add(obj.profile_id)
+            self.result(index, op, type, obj.id)
+        if type in SKILLED_TYPES:
+            self.set_skills(model, [(index, obj, data.get('skills', [])) for (index, _, _, data), obj in zip(operations, objs)])
+
+    def update_items(self, type, operations):
+        if not operations:
+            return
+        objects = self.fetch(type, operations)
+        fields = set()
+        for index, op, _, data in operations:
+            obj = objects[data['id']]
+            for field, value in self.values(type, data).items():
+                if field in data:
+                    setattr(obj, field, value)
+                    fields.add(field)
+            if type == 'profile':
+                obj.updated_at = timezone.now()
+                fields.add('updated_at')
+                self.touched.add(obj.id)
+            else:
+                self.touched.add(obj.profile_id)
+            self.result(index, op, type, obj.id)
+        if fields:
+            MODELS[type].objects.bulk_update(list(objects.values()), sorted(fields))
+        if type == 'profile':
+            # Les identifiants modifiés désignent désormais ces profils
+            self.forget_profiles(set(objects))
+            self.profiles.update((profile.identifiant, profile) for profile in objects.values())
+        if type in SKILLED_TYPES:
+            self.set_skills(MODELS[type], [(index, objects[data['id']], data.get('skills', [])) for index, _, _, data in operations])
+
+    def set_skills(self, model, items):
+        """Remplace les compétences des éléments, comme save_data (une liste vide les conserve)
+
+        items : (position de l'opération, élément, identifiants de compétences). Pour un élément
+        modifié plusieurs fois, la dernière liste non vide l'emporte.
+        """
+        items = {obj.id: (index, obj, skill_ids) for index, obj, skill_ids in items if skill_ids}
+        if not items:
+            return
+        known = set(Skill.objects.filter(
+            id__in={skill_id for _, _, skill_ids in items.values() for skill_id in skill_ids}
+        ).values_list('id', flat=True))
+        for index, _, skill_ids in items.values():
+            if not known.issuperset(skill_ids):
+                raise BatchError(index, 'Compétence introuvable')
+
+        through = model.skills.through
+        item_field = f'{model._meta.model_name}_id'
+        through.objects.filter(**{f'{item_field}__in': list(items)}).delete()
+        through.objects.bulk_create([
+            through(**{item_field: obj.id, 'skill_id': skill_id})
+            for _, obj, skill_ids in items.values()
+            for skill_id in dict.fromkeys(skill_ids)
+        ])
+
+    def save_skills(self, operations):
+        """Crée ou modifie les compétences et leur niveau pour le profil indiqué"""
+        if not operations:
+            return
+        updates = [operation for operation in operations if operation[1] == 'update']
+        skills = self.fetch('skill', updates) if updates else {}
+        for index, op, type, data in updates:
+            skill = skills[data['id']]
+            skill.category = data.get('category', skill.category)
+            skill.name = data.get('name', skill.name)
+        if skills:
+            Skill.objects.bulk_update(list(skills.values()), ['category', 'name'])
+            # Une compétence est partagée : tous les profils qui l'affichent sont concernés
+            for skill in skills.values():
+                self.touched.update(skill_profile_ids(skill))
+
+        # Les compétences créées sont partagées par (catégorie, nom)
+        creates = [operation for operation in operations if operation[1] == 'create']
+        keys = {(data.get('category', ''), data.get('name', '')) for _, _, _, data in creates}
+        existing = {
+            (skill.category, skill.name): skill
+            for skill in Skill.objects.filter(
+                category__in={category for category, _ in keys}, name__in={name for _, name in keys}
+            )
+        }
+        missing = [Skill(category=category, name=name) for category, name in keys if (category, name) not in existing]
+        for skill in Skill.objects.bulk_create(missing):
+            existing[skill.category, skill.name] = skill
+
+        levels = {}
+        for index, op, type, data in operations:
+            skill = skills[data['id']] if op == 'update' else existing[data.get('category', ''), data.get('name', '')]
+            if data.get('profile'):
+                profile = self.profile_for(index, data)
+                levels[profile.id, skill.id] = data.get('level', 5)
+                self.touched.add(profile.id)
+            self.result(index, op, type, skill.id)
+
+        # Niveau de la compétence pour chaque profil
+        profile_skills = {
+            (ps.profile_id, ps.skill_id): ps
+            for ps in ProfileSkill.objects.filter(
+                profile__in={profile_id for profile_id, _ in levels}, skill__in={skill_id for _, skill_id in levels}
+            )
+        }
+        to_update = []
+        to_create = []
+        for (profile_id, skill_id), level in levels.items():
+            ps = profile_skills.get((profile_id, skill_id))
+            if ps is None:
+                to_create.append(ProfileSkill(profile_id=profile_id, skill_id=skill_id, level=level))
+            else:
+                ps.level = level
+                to_update.append(ps)
+        ProfileSkill.objects.bulk_create(to_create)
+        ProfileSkill.objects.bulk_update(to_update, ['level'])
+
+    def delete_skills(self, operations):
+        """Retire les compétences des profils indiqués, comme delete_skill"""
+        for index, op, type, data in operations:
+            profile = self.profile_for(index, data)
+            skill_id = data['id']
+            ProfileSkill.objects.filter(profile=profile, skill_id=skill_id).delete()
+            Experience.skills.through.objects.filter(experience__profile=profile, skill_id=skill_id).delete()
+            Project.skills.through.objects.filter(project__profile=profile, skill_id=skill_id).delete()
+            self.touched.add(profile.id)
+            self.result(index, op, type, skill_id)
+
+    def delete_items(self, type, operations):
+        if not operations:
+            return
+        objects = self.fetch(type, operations)
+        seen = set()
+        for index, _, _, data in operations:
+            # Une seconde suppression du même élément échouerait si les opérations étaient envoyées une à une
+            if data['id'] in seen:
+                raise BatchError(index, f'{type} introuvable')
+            seen.add(data['id'])
+        if type == 'profile':
+            self.forget_profiles(set(objects))
+        else:
+            self.touched.update(obj.profile_id for obj in objects.values())
+        MODELS[type].objects.filter(id__in=list(objects)).delete()
+        for index, op, _, data in operations:
+            self.result(index, op, type, data['id'])
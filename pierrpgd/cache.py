@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from .models import Profile
+
+# Espaces de noms des données mises en cache pour un profil
+PORTFOLIO = 'portfolio'
+LOAD_DATA = 'load_data'
+SKILLS = 'skills'
+THEME = 'theme'
+NAMESPACES = (PORTFOLIO, LOAD_DATA, SKILLS, THEME)
+# Réponses de l'API des sections : pas de cache serveur, seulement un ETag
+API = 'api'
+
+# Version du format de la donnée de chaque espace de noms, incluse dans la clé et dans l'ETag des
+# réponses : à incrémenter quand la forme de la donnée ou le gabarit change, les entrées écrites
+# avant le déploiement (caches fichier ou Redis, navigateurs) ne sont alors plus valides
+FORMAT_VERSIONS = {
+    # 2 : page rendue à partir des compétences regroupées par catégorie
+    PORTFOLIO: 2,
+    LOAD_DATA: 1,
+    # 2 : catégories de compétences avec largeur des jauges (au lieu de la liste des compétences)
+    SKILLS: 2,
+    # 2 : feuille de style sans l'identifiant du profil
+    THEME: 2,
+    API: 1,
+}
+
+# Durée de conservation d'une donnée en cache (les profils changent rarement)
+PORTFOLIO_CACHE_TIMEOUT = 60 * 60 * 24
+
+def profile_cache_key(namespace, identifiant, updated_at):
+    """Clé de cache d'une donnée d'un profil, liée à l'identifiant et à la date de mise à jour du profil
+
+    Une modification du profil change la clé : les copies gardées par d'autres processus
+    (cache en mémoire locale) ne sont plus jamais lues.
+    """
+    return f"pierrpgd:{namespace}:v{FORMAT_VERSIONS[namespace]}:{identifiant}:{updated_at.timestamp()}"
+
+def portfolio_cache_key(identifiant, updated_at):
+    return profile_cache_key(PORTFOLIO, identifiant, updated_at)
+
+async def aget_cached(namespace, profile):
+    return await cache.aget(profile_cache_key(namespace, profile.identifiant, profile.updated_at))
+
+async def aset_cached(namespace, profile, value):
+    await cache.aset(profile_cache_key(namespace, profile.identifiant, profile.updated_at), value, PORTFOLIO_CACHE_TIMEOUT)
+
+def evict_portfolio(profile):
+    cache.delete_many([profile_cache_key(namespace, profile.identifiant, profile.updated_at) for namespace in NAMESPACES])
+
+def evict_portfolios(profile_ids):
+    """Supprime du cache les données des profils indiqués, dans tous les espaces de noms"""
+    keys = [
+        profile_cache_key(namespace, identifiant, updated_at)
+        for identifiant, updated_at in Profile.objects.filter(id__in=profile_ids).values_list('identifiant', 'updated_at')
+        for namespace in NAMESPACES
+    ]
+    if keys:
+        cache.delete_many(keys)
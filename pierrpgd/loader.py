@@ -0,0 +1,356 @@
+from collections import defaultdict
+from django.db import connections, models, transaction
+from .models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
+from .signals import default_palette, touch_profiles
+import itertools
+import json
+import sys
+
+COLOR_FIELDS = ('red', 'green', 'blue', 'transparency')
+
+# Clé naturelle des éléments pour --upsert : une ligne du fichier met à jour l'élément de même clé
+# (les couleurs n'en ont pas, leur rôle dépend de leur position)
+NATURAL_KEYS = {
+    About: ('content',),
+    Experience: ('dates', 'company', 'position'),
+    Education: ('dates', 'institution', 'title'),
+    Project: ('title',),
+}
+
+# Champs importés pour chaque section d'une personne (clé du fichier JSON, modèle, relation du profil, champs)
+SECTIONS = (
+    ('experiences', Experience, 'experience', ('dates', 'position', 'company', 'location', 'description', 'details', 'url')),
+    ('educations', Education, 'education', ('dates', 'title', 'institution', 'field', 'location', 'description', 'details', 'url')),
+    ('projects', Project, 'projects', ('title', 'description', 'details', 'image_url', 'url')),
+)
+
+def read_persons(path, format=None):
+    """Personnes d'un fichier (ou de l'entrée standard avec '-'), lues une par une
+
+    Format 'ndjson' : une personne par ligne, analysée au fil de la lecture.
+    Format 'json' : tableau de personnes, chargé en entier (fichier init_db.json).
+    """
+    if format is None:
+        format = 'json' if str(path).endswith('.json') else 'ndjson'
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        if format == 'json':
+            yield from json.load(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def export_person(profile):
+    """Personne au format d'import, à partir d'un profil dont les sections sont préchargées"""
+    return {
+        'profile': {'name': profile.name, 'identifiant': profile.identifiant, 'title': profile.title},
+        # Les couleurs exportées remplacent la palette par défaut à l'import
+        'default_colors': False,
+        'colors': [
+            {'red': color.red, 'green': color.green, 'blue': color.blue, 'transparency': color.transparency}
+            for color in profile.color_set.all()
+        ],
+        'skills': [
+            {'category': ps.skill.category, 'name': ps.skill.name, 'level': ps.level}
+            for ps in profile.profileskill_set.all()
+        ],
+        'about': [about.content for about in profile.about.all()],
+        **{
+            key: [
+                dict({field: getattr(item, field) for field in fields}, skills=[skill.name for skill in item.skills.all()])
+                for item in getattr(profile, related_name).all()
+            ]
+            for key, model, related_name, fields in SECTIONS
+        },
+    }
+
+def resolve_skills(persons):
+    """Compétences de toutes les personnes, indexées par (catégorie, nom) : une lecture et une création groupée
+
+    Les sections ne nomment que des compétences : celles déclarées par une personne d'un autre
+    paquet, ou seulement présentes en base, sont lues aussi. Pour un même nom, les compétences
+    déclarées dans le paquet viennent en dernier et sont donc prioritaires.
+    """
+    # Les compétences manquantes sont créées dans l'ordre du fichier
+    keys = dict.fromkeys((skill['category'], skill['name']) for person in persons for skill in person['skills'])
+    section_names = {
+        skill_name
+        for person in persons
+        for key, _, _, _ in SECTIONS
+        for item in person[key]
+        for skill_name in item['skills']
+    }
+    found = {
+        (skill.category, skill.name): skill
+        for skill in Skill.objects.filter(name__in={name for _, name in keys} | section_names).order_by('id')
+    }
+    skills = {key: skill for key, skill in found.items() if key not in keys and key[1] in section_names}
+    missing = [Skill(category=category, name=name) for category, name in keys if (category, name) not in found]
+    if missing:
+        # Une compétence créée entre-temps par un autre import n'est pas une erreur
+        Skill.objects.bulk_create(missing, update_conflicts=True, unique_fields=['category', 'name'], update_fields=['name'])
+        # Les identifiants ne sont pas renvoyés en cas de conflit : relecture des compétences créées
+        found.update(
+            ((skill.category, skill.name), skill)
+            for skill in Skill.objects.filter(name__in={skill.name for skill in missing})
+        )
+    for key in keys:
+        skills[key] = found[key]
+    return skills
+
+def section_skill(skills_by_name, skill_name):
+    try:
+        return skills_by_name[skill_name]
+    except KeyError:
+        raise ValueError(f"Compétence inconnue : {skill_name}")
+
+class BulkLoader:
+    """Import d'une personne en requêtes groupées (bulk_create), dans une seule transaction
+
+    bulk_create ne déclenche pas les signaux : l'ordre des éléments est calculé ici.
+    """
+
+    def __init__(self, skills):
+        self.skills = skills
+        self.skills_by_name = {skill.name: skill for skill in skills.values()}
+
+    def load(self, person):
+        with transaction.atomic():
+            profile = Profile.objects.create(
+                name=person['profile']['name'],
+                identifiant=person['profile']['identifiant'],
+                title=person['profile']['title']
+            )
+
+            # Les couleurs s'ajoutent à la palette par défaut créée avec le profil, ou la remplacent
+            if not person.get('default_colors', True):
+                Color.objects.filter(profile=profile).delete()
+            first_order = Color.objects.filter(profile=profile).aggregate(models.Max('order'))['order__max']
+            first_order = 0 if first_order is None else first_order + 1
+            Color.objects.bulk_create([
+                Color(
+                    profile=profile,
+                    order=first_order + order,
+                    red=color['red'],
+                    green=color['green'],
+                    blue=color['blue'],
+                    transparency=color['transparency']
+                )
+                for order, color in enumerate(person['colors'])
+            ])
+
+            skills_by_name, levels = self.person_skills(person)
+            ProfileSkill.objects.bulk_create([
+                ProfileSkill(profile=profile, skill_id=skill_id, level=level)
+                for skill_id, level in levels.items()
+            ])
+
+            About.objects.bulk_create([
+                About(profile=profile, content=content, order=order)
+                for order, content in enumerate(person['about'])
+            ])
+
+            for key, model, _, fields in SECTIONS:
+                items = model.objects.bulk_create([
+                    model(profile=profile, order=order, **{field: item_data[field] for field in fields})
+                    for order, item_data in enumerate(person[key])
+                ])
+                through = model.skills.through
+                item_field = f'{model._meta.model_name}_id'
+                through.objects.bulk_create([
+                    through(**{item_field: item.id, 'skill_id': section_skill(skills_by_name, skill_name).id})
+                    for item, item_data in zip(items, person[key])
+                    for skill_name in item_data['skills']
+                ])
+
+        return profile
+
+    def person_skills(self, person):
+        """Compétences d'une personne indexées par nom, et niveau par identifiant de compétence
+
+        Les sections ne référencent les compétences que par leur nom, ceux de la personne en priorité.
+        """
+        skills_by_name = dict(self.skills_by_name)
+        levels = {}
+        for skill_data in person['skills']:
+            skill = self.skills[skill_data['category'], skill_data['name']]
+            skills_by_name[skill.name] = skill
+            levels[skill.id] = skill_data['level']
+        return skills_by_name, levels
+
+    def upsert(self, person):
+        """Crée la personne, ou n'écrit que les lignes qui diffèrent de la base
+
+        Renvoie le profil et son statut : 'created', 'updated' ou 'unchanged'.
+        """
+        profile = Profile.objects.filter(identifiant=person['profile']['identifiant']).first()
+        if profile is None:
+            return self.load(person), 'created'
+
+        with transaction.atomic():
+            changed = False
+            values = {field: person['profile'][field] for field in ('name', 'title')}
+            if any(getattr(profile, field) != value for field, value in values.items()):
+                # update() : la version du contenu est incrémentée plus bas, une seule fois
+                Profile.objects.filter(pk=profile.pk).update(**values)
+                changed = True
+
+            colors = [dict(zip(COLOR_FIELDS, color)) for color in default_palette()]
+            if not person.get('default_colors', True):
+                colors = []
+            _, colors_changed = sync_rows(Color, profile, colors + person['colors'], COLOR_FIELDS)
+            changed |= colors_changed
+
+            skills_by_name, levels = self.person_skills(person)
+            changed |= sync_levels(profile, levels)
+
+            _, about_changed = sync_rows(About, profile, [{'content': content} for content in person['about']], ('content',), NATURAL_KEYS[About])
+            changed |= about_changed
+
+            for key, model, _, fields in SECTIONS:
+                items, items_changed = sync_rows(model, profile, person[key], fields, NATURAL_KEYS[model])
+                links = {
+                    item.id: {section_skill(skills_by_name, skill_name).id for skill_name in item_data['skills']}
+                    for item, item_data in zip(items, person[key])
+                }
+                changed |= items_changed | sync_links(model, links)
+
+            if changed:
+                # Les écritures groupées ne déclenchent pas les signaux
+                touch_profiles([profile.id])
+        return profile, 'updated' if changed else 'unchanged'
+
+def sync_rows(model, profile, rows, fields, key=None):
+    """Aligne les éléments d'un profil sur les lignes du fichier
+
+    Avec key (champs de la clé naturelle), chaque ligne met à jour l'élément existant de même
+    clé : insérer une ligne ne réécrit que l'ordre des suivantes, et chaque élément garde son
+    ID et ses compétences. Sans clé, les éléments sont associés position par position.
+    Seuls les éléments modifiés sont écrits (bulk_update), les manquants créés et ceux absents
+    du fichier supprimés. Renvoie les éléments dans l'ordre et s'il y a eu une écriture.
+    """
+    existing = list(model.objects.filter(profile=profile).order_by('order', 'id'))
+    if key is None:
+        matches = existing[:len(rows)] + [None] * (len(rows) - len(existing))
+    else:
+        by_key = defaultdict(list)
+        for item in existing:
+            by_key[tuple(getattr(item, field) for field in key)].append(item)
+        # Lignes de même clé : associées dans l'ordre aux éléments de même clé
+        matches = []
+        for row in rows:
+            candidates = by_key.get(tuple(row[field] for field in key))
+            matches.append(candidates.pop(0) if candidates else None)
+
+    items = []
+    to_update = []
+    to_create = []
+    for order, (row, item) in enumerate(zip(rows, matches)):
+        values = dict({field: row[field] for field in fields}, order=order)
+        if item is not None:
+            if any(getattr(item, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(item, field, value)
+                to_update.append(item)
+        else:
+            item = model(profile=profile, **values)
+            to_create.append(item)
+        items.append(item)
+    matched = {item.id for item in matches if item is not None}
+    surplus = [item.id for item in existing if item.id not in matched]
+
+    if surplus:
+        model.objects.filter(id__in=surplus).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, ['order', *fields])
+    if to_create:
+        model.objects.bulk_create(to_create)
+    return items, bool(to_update or to_create or surplus)
+
+def sync_levels(profile, levels):
+    """Aligne les compétences du profil (identifiant → niveau) ; renvoie s'il y a eu une écriture"""
+    existing = {ps.skill_id: ps for ps in ProfileSkill.objects.filter(profile=profile)}
+    to_update = []
+    for skill_id, level in levels.items():
+        ps = existing.get(skill_id)
+        if ps is not None and ps.level != level:
+            ps.level = level
+            to_update.append(ps)
+    to_create = [
+        ProfileSkill(profile=profile, skill_id=skill_id, level=level)
+        for skill_id, level in levels.items() if skill_id not in existing
+    ]
+    surplus = [ps.id for skill_id, ps in existing.items() if skill_id not in levels]
+
+    if to_update:
+        ProfileSkill.objects.bulk_update(to_update, ['level'])
+    if to_create:
+        ProfileSkill.objects.bulk_create(to_create)
+    if surplus:
+        ProfileSkill.objects.filter(id__in=surplus).delete()
+    return bool(to_update or to_create or surplus)
+
+def sync_links(model, links):
+    """Aligne les compétences des éléments d'une section (identifiant → compétences) ; renvoie s'il y a eu une écriture"""
+    through = model.skills.through
+    item_field = f'{model._meta.model_name}_id'
+    existing = through.objects.filter(**{f'{item_field}__in': list(links)}).values_list('id', item_field, 'skill_id')
+    surplus = [link_id for link_id, item_id, skill_id in existing if skill_id not in links[item_id]]
+    present = {(item_id, skill_id) for _, item_id, skill_id in existing}
+    missing = [
+        through(**{item_field: item_id, 'skill_id': skill_id})
+        for item_id, skill_ids in links.items()
+        for skill_id in sorted(skill_ids) if (item_id, skill_id) not in present
+    ]
+
+    if surplus:
+        through.objects.filter(id__in=surplus).delete()
+    if missing:
+        through.objects.bulk_create(missing)
+    return bool(surplus or missing)
+
+def init_worker():
+    """Initialise Django dans un processus d'import, avec ses propres connexions"""
+    import django
+    django.setup()
+    connections.close_all()
+
+def load_persons(args):
+    """Importe une part des personnes d'un paquet (exécuté dans un processus d'import)
+
+    Renvoie (identifiant, ID, statut) pour chaque personne.
+    """
+    skills, persons, upsert = args
+    loader = BulkLoader(skills)
+    if upsert:
+        return [(profile.identifiant, profile.id, status) for profile, status in map(loader.upsert, persons)]
+    return [(profile.identifiant, profile.id, 'created') for profile in map(loader.load, persons)]
+
+def split_contiguous(items, parts):
+    """Découpe items en parts tranches contiguës de tailles voisines (tranches vides omises)"""
+    size, extra = divmod(len(items), parts)
+    slices = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0)
+        if end > start:
+            slices.append(items[start:end])
+        start = end
+    return slices
+
+def load_in_parts(map_function, skills, persons, parts, upsert):
+    """Importe les personnes par tranches contiguës, une par processus (map_function : Pool.map)
+
+    Les résultats concaténés suivent l'ordre du fichier.
+    """
+    results = map_function(load_persons, [(skills, part, upsert) for part in split_contiguous(persons, parts)])
+    return [loaded for part in results for loaded in part]
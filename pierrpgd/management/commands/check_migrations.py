@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, migrations
+from django.db.migrations.executor import MigrationExecutor
+
+# Opérations qui suppriment ou renomment des données encore lues par la version déployée
+DESTRUCTIVE_OPERATIONS = (
+    migrations.DeleteModel,
+    migrations.RemoveField,
+    migrations.RenameModel,
+    migrations.RenameField,
+    migrations.AlterModelTable,
+)
+
+class Command(BaseCommand):
+    help = 'Fail when unapplied migrations contain destructive operations (dropped or renamed tables and columns)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_labels',
+            nargs='*',
+            default=['pierrpgd'],
+            help='Apps whose migrations are checked (default: pierrpgd)'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database whose unapplied migrations are checked (default: "default")'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Check every migration, applied or not'
+        )
+        parser.add_argument(
+            '--allow',
+            action='append',
+            default=[],
+            metavar='APP_LABEL.MIGRATION_NAME',
+            help='Migration allowed to be destructive (repeatable), once no deployed code reads the removed data'
+        )
+
+    def handle(self, *args, **options):
+        executor = MigrationExecutor(connections[options['database']])
+        graph = executor.loader.graph
+        if options['all']:
+            keys = dict.fromkeys(key for leaf in graph.leaf_nodes() for key in graph.forwards_plan(leaf))
+            migration_list = [graph.nodes[key] for key in keys]
+        else:
+            migration_list = [migration for migration, backwards in executor.migration_plan(graph.leaf_nodes()) if not backwards]
+
+        migration_list = [migration for migration in migration_list if migration.app_label in options['app_labels']]
+
+        errors = []
+        for migration in migration_list:
+            if f'{migration.app_label}.{migration.name}' in options['allow']:
+                continue
+            for operation in migration.operations:
+                if isinstance(operation, DESTRUCTIVE_OPERATIONS):
+                    errors.append(f"{migration.app_label}.{migration.name}: {operation.describe()}")
+
+        if errors:
+            # La version en production lit encore ces tables et colonnes pendant le déploiement
+            raise CommandError(
+                "Opérations destructives dans les migrations :\n  " + "\n  ".join(errors)
+                + "\nDéployez d'abord le code qui ne les utilise plus, puis relancez avec --allow"
+                + " (variable MIGRATION_ALLOW de build.sh)."
+            )
+        self.stdout.write(f"{len(migration_list)} migration(s) vérifiée(s), aucune opération destructive")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+import json
+import sys
+from pierrpgd.models import Profile, ProfileSkill, Color
+from pierrpgd.loader import SECTIONS, export_person
+
+class Command(BaseCommand):
+    help = 'Export profiles as newline-delimited JSON (one person per line), readable by init_db'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help='Output file, or - for stdout (default)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Number of profiles fetched (with their sections) per batch'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size doit être supérieur ou égal à 1")
+
+        # Les profils sont lus par paquets, sections préchargées, sans tout garder en mémoire
+        profiles = Profile.objects.order_by('id').prefetch_related(
+            Prefetch('color_set', queryset=Color.objects.order_by('order')),
+            Prefetch('profileskill_set', queryset=ProfileSkill.objects.select_related('skill').order_by('id')),
+            'about',
+            *[f'{related_name}__skills' for _, _, related_name, _ in SECTIONS],
+        ).iterator(chunk_size=options['chunk_size'])
+
+        f = sys.stdout if options['path'] == '-' else open(options['path'], 'w', encoding='utf-8')
+        try:
+            count = 0
+            for profile in profiles:
+                f.write(json.dumps(export_person(profile), ensure_ascii=False) + '\n')
+                count += 1
+        finally:
+            if f is not sys.stdout:
+                f.close()
+
+        self.stderr.write(f"{count} profil(s) exporté(s)")
@@ -1,19 +1,67 @@
-from django.core.management.base import BaseCommand
-import json
+from django.core.management.base import BaseCommand, CommandError
 from pierrpgd.models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
+from pierrpgd.loader import chunked, init_worker, load_in_parts, load_persons, read_persons, resolve_skills
+from django.db import connection, connections
+import itertools
+import multiprocessing
 import os
+import time
+
+# Message affiché pour chaque personne selon le résultat de son import
+STATUS_MESSAGES = {
+    'created': "Profil créé",
+    'updated': "Profil mis à jour",
+    'unchanged': "Profil inchangé",
+}
 
 class Command(BaseCommand):
     help = 'Initialize database with JSON data'
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=os.path.join(os.path.dirname(__file__), 'init_db.json'),
+            help='Data file, one person per line (NDJSON), or - for stdin (default: bundled init_db.json)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['json', 'ndjson'],
+            help='Input format (default: json for .json files, ndjson otherwise)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of persons whose skills are resolved together in bulk mode'
+        )
         parser.add_argument(
             '--force', 
             action='store_true',
             help='Force reset database before initialization'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Load each person with bulk inserts in a single transaction'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes loading persons in parallel (implies --bulk, serial on SQLite)'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Update existing profiles, writing only the rows that changed (implies --bulk)'
+        )
 
     def handle(self, *args, **options):
+        # Vérifié avant --force : une taille invalide n'importerait personne (0) ou échouerait (négative)
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size doit être supérieur ou égal à 1")
+
         if options['force']:
             self.stdout.write("Force resetting database...")
             Profile.objects.all().delete()
@@ -25,11 +73,14 @@ class Command(BaseCommand):
             Color.objects.all().delete()
 
         try:
-            # Charger les données depuis le fichier JSON
-            with open(os.path.join(os.path.dirname(__file__), 'init_db.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Les personnes sont lues une par une depuis le fichier
+            persons = read_persons(options['path'], options['format'])
 
-            for person in data:
+            if options['bulk'] or options['upsert'] or options['workers'] > 1:
+                self.load_bulk(persons, options['chunk_size'], options['workers'], options['upsert'])
+                return
+
+            for person in persons:
 
                 # Vérifier si le profil existe déjà
                 if Profile.objects.filter(identifiant=person["profile"]["identifiant"]).exists():
@@ -45,6 +96,10 @@ class Command(BaseCommand):
                 )
                 self.stdout.write(f"Profil créé avec l'ID: {profile.id}")
 
+                # Les couleurs exportées remplacent la palette par défaut
+                if not person.get("default_colors", True):
+                    Color.objects.filter(profile=profile).delete()
+
                 # Création des couleurs
                 self.stdout.write("Création des couleurs...")
                 for color in person["colors"]:
@@ -125,4 +180,63 @@ class Command(BaseCommand):
                 self.stdout.write("Initialisation de la base de données terminée avec succès!")
 
         except Exception as e:
-            self.stderr.write(f"Error: {str(e)}")
\ No newline at end of file
+            # Code de sortie non nul : un déploiement ne continue pas sur un import partiel
+            raise CommandError(f"Error: {str(e)}") from e
+
+    def load_bulk(self, persons, chunk_size, workers, upsert):
+        start = time.perf_counter()
+
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite n'accepte qu'un écrivain à la fois : les processus ne feraient que s'attendre
+            self.stdout.write("SQLite : import en série")
+            workers = 1
+
+        pool = None
+        if workers > 1:
+            # Chaque processus ouvre ses propres connexions
+            connections.close_all()
+            pool = multiprocessing.Pool(workers, initializer=init_worker)
+        try:
+            counts = self.load_chunks(persons, chunk_size, pool, workers, upsert)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        elapsed = time.perf_counter() - start
+        if upsert:
+            self.stdout.write(
+                f"{counts['created']} profil(s) créé(s), {counts['updated']} mis à jour, "
+                f"{counts['unchanged']} inchangé(s) en {elapsed:.2f} s"
+            )
+        else:
+            self.stdout.write(f"{counts['created']} profil(s) importé(s) en {elapsed:.2f} s")
+
+    def load_chunks(self, persons, chunk_size, pool, workers, upsert):
+        counts = dict.fromkeys(STATUS_MESSAGES, 0)
+        for chunk in chunked(persons, chunk_size):
+            # Les compétences d'un paquet de personnes sont résolues une seule fois, avant répartition
+            skills = resolve_skills(chunk)
+
+            if upsert:
+                to_load = chunk
+            else:
+                # Vérifier si les profils existent déjà : l'import s'arrête au premier existant
+                existing = set(Profile.objects.filter(
+                    identifiant__in=[person["profile"]["identifiant"] for person in chunk]
+                ).values_list('identifiant', flat=True))
+                to_load = list(itertools.takewhile(lambda person: person["profile"]["identifiant"] not in existing, chunk))
+
+            if pool is None:
+                loaded = load_persons((skills, to_load, upsert))
+            else:
+                loaded = load_in_parts(pool.map, skills, to_load, workers, upsert)
+
+            for identifiant, profile_id, status in loaded:
+                self.stdout.write(f"{STATUS_MESSAGES[status]}: {identifiant} (ID: {profile_id})")
+                counts[status] += 1
+
+            if len(to_load) < len(chunk):
+                self.stdout.write("Profile already exists")
+                return counts
+        return counts
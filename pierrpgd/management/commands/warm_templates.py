@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.template import engines
+from pierrpgd.models import Profile
+from pierrpgd.snapshots import current_snapshot, skill_categories
+from pierrpgd.templating import warm_templates
+from pierrpgd.theme import theme_context
+from pierrpgd.views import portfolio_context, profile_listing
+import time
+
+class Command(BaseCommand):
+    help = 'Compile every pierrpgd template and report its parse and render times'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile',
+            help='Identifiant of the profile used to render templates (default: first profile)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Number of renders averaged per template after the first one'
+        )
+
+    def handle(self, *args, **options):
+        # Mesurer la compilation : les gabarits déjà en cache sont oubliés
+        for loader in engines['django'].engine.template_loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+        parse_times = warm_templates()
+
+        contexts = self.contexts(options['profile'])
+        for name, parse_time in parse_times.items():
+            line = f"{name:<20} compilation {parse_time * 1000:8.2f} ms"
+            if name in contexts:
+                first, average = self.render_times(name, contexts[name], options['repeat'])
+                line += f"   premier rendu {first * 1000:8.2f} ms   rendu moyen {average * 1000:8.2f} ms"
+            else:
+                line += "   (pas de contexte de rendu)"
+            self.stdout.write(line)
+
+        self.stdout.write(f"{len(parse_times)} gabarit(s) compilé(s) en {sum(parse_times.values()) * 1000:.2f} ms")
+
+    def contexts(self, identifiant):
+        """Contexte de rendu de chaque gabarit, construit comme dans les vues"""
+        query, page, next_after = profile_listing({})
+        contexts = {
+            'base.html': {},
+            'data_display.html': {'profiles': page, 'query': query, 'next_after': next_after},
+        }
+        profiles = Profile.objects.select_related('snapshot').order_by('id')
+        profile = profiles.filter(identifiant=identifiant).first() if identifiant else profiles.first()
+        if profile is None:
+            self.stdout.write("Aucun profil : portfolio.html et theme.css ne sont pas rendus")
+            return contexts
+
+        snapshot = current_snapshot(profile)
+        contexts['portfolio.html'] = portfolio_context(profile, snapshot, skill_categories(snapshot))
+        contexts['theme.css'] = theme_context(snapshot)
+        return contexts
+
+    def render_times(self, name, context, repeat):
+        template = engines['django'].get_template(name)
+
+        # Le premier rendu remplit aussi les fragments en cache de la page
+        start = time.perf_counter()
+        template.render(context)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            template.render(context)
+        average = (time.perf_counter() - start) / max(repeat, 1)
+        return first, average
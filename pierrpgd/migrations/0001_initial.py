@@ -0,0 +1,129 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifiant', models.CharField(default='default', max_length=100, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('title', models.CharField(default='', max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('details', models.TextField(default='')),
+                ('order', models.IntegerField(default=0)),
+                ('image_url', models.URLField(blank=True, null=True)),
+                ('url', models.URLField(blank=True, null=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='pierrpgd.profile')),
+                ('skills', models.ManyToManyField(blank=True, to='pierrpgd.skill')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfileSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.IntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pierrpgd.profile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pierrpgd.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='skills',
+            field=models.ManyToManyField(blank=True, through='pierrpgd.ProfileSkill', to='pierrpgd.skill'),
+        ),
+        migrations.CreateModel(
+            name='Experience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dates', models.CharField(max_length=50)),
+                ('company', models.CharField(max_length=100)),
+                ('location', models.CharField(max_length=100)),
+                ('position', models.CharField(max_length=150)),
+                ('description', models.TextField()),
+                ('details', models.TextField(default='')),
+                ('order', models.IntegerField(default=0)),
+                ('url', models.URLField(blank=True, null=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='experience', to='pierrpgd.profile')),
+                ('skills', models.ManyToManyField(blank=True, to='pierrpgd.skill')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Education',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dates', models.CharField(max_length=50)),
+                ('institution', models.CharField(max_length=100)),
+                ('location', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=150)),
+                ('field', models.CharField(max_length=150)),
+                ('description', models.TextField()),
+                ('details', models.TextField(default='')),
+                ('order', models.IntegerField(default=0)),
+                ('url', models.URLField(blank=True, null=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='education', to='pierrpgd.profile')),
+                ('skills', models.ManyToManyField(blank=True, to='pierrpgd.skill')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Color',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(default=0)),
+                ('red', models.IntegerField(default=0)),
+                ('green', models.IntegerField(default=0)),
+                ('blue', models.IntegerField(default=0)),
+                ('transparency', models.IntegerField(default=100)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pierrpgd.profile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='About',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField()),
+                ('order', models.IntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='about', to='pierrpgd.profile')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+    ]
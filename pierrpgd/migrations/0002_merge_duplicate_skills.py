@@ -0,0 +1,45 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:41
+
+from django.db import migrations
+
+
+def merge_duplicates(apps, schema_editor):
+    """Fusionne les doublons avant d'ajouter les contraintes d'unicité"""
+    Skill = apps.get_model('pierrpgd', 'Skill')
+    ProfileSkill = apps.get_model('pierrpgd', 'ProfileSkill')
+
+    # Compétences de même (catégorie, nom) : les liaisons sont reportées sur la plus ancienne
+    kept = {}
+    for skill in Skill.objects.order_by('id'):
+        keeper = kept.setdefault((skill.category, skill.name), skill)
+        if keeper.id == skill.id:
+            continue
+        for model_name in ('Experience', 'Education', 'Project'):
+            through = apps.get_model('pierrpgd', model_name).skills.through
+            item_field = f'{model_name.lower()}_id'
+            linked = set(through.objects.filter(skill_id=keeper.id).values_list(item_field, flat=True))
+            through.objects.filter(skill_id=skill.id, **{f'{item_field}__in': linked}).delete()
+            through.objects.filter(skill_id=skill.id).update(skill_id=keeper.id)
+        ProfileSkill.objects.filter(skill_id=skill.id).update(skill_id=keeper.id)
+        skill.delete()
+
+    # Niveaux en double pour un même profil : le dernier enregistré est conservé
+    seen = set()
+    for ps in ProfileSkill.objects.order_by('-id'):
+        if (ps.profile_id, ps.skill_id) in seen:
+            ps.delete()
+        seen.add((ps.profile_id, ps.skill_id))
+
+
+# Données corrigées dans une migration distincte, avant les contraintes de 0003_indexes :
+# sur PostgreSQL, les clés étrangères sont DEFERRABLE INITIALLY DEFERRED et un ALTER TABLE
+# dans la transaction qui vient de modifier ces tables échouerait (pending trigger events).
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pierrpgd', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
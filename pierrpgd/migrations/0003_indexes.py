@@ -0,0 +1,41 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pierrpgd', '0002_merge_duplicate_skills'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='about',
+            index=models.Index(fields=['profile', 'order'], name='pierrpgd_ab_profile_53306f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='color',
+            index=models.Index(fields=['profile', 'order'], name='pierrpgd_co_profile_518d52_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['profile', 'order'], name='pierrpgd_ed_profile_496a8c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['profile', 'order'], name='pierrpgd_ex_profile_92d715_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['profile', 'order'], name='pierrpgd_pr_profile_0e7d8f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='profileskill',
+            constraint=models.UniqueConstraint(fields=('profile', 'skill'), name='unique_profileskill_profile_skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(fields=('category', 'name'), name='unique_skill_category_name'),
+        ),
+    ]
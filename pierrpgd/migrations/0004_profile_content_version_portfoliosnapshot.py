@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:23
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pierrpgd', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='pierrpgd.profile')),
+                ('content_version', models.PositiveIntegerField(default=0)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('skills_index', models.JSONField(default=dict)),
+                ('section_versions', models.JSONField(default=dict)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
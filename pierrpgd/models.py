@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 class Profile(models.Model):
@@ -7,10 +8,18 @@ class Profile(models.Model):
     title = models.CharField(max_length=100, default='')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
+    # Incrémenté à chaque modification d'un élément lié (About, Experience, ...)
+    content_version = models.PositiveIntegerField(default=0)
     skills = models.ManyToManyField('Skill', through='ProfileSkill', blank=True)
 
     def save(self, *args, **kwargs):
         self.updated_at = timezone.now()
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # content_version n'est incrémenté que par les signaux des éléments liés
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'content_version'
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -19,6 +28,12 @@ class Profile(models.Model):
 class Skill(models.Model):
     category = models.CharField(max_length=100, blank=False)
     name = models.CharField(max_length=100, blank=False)
+
+    class Meta:
+        # Une compétence est partagée entre les profils : recherchée par (catégorie, nom)
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'name'], name='unique_skill_category_name'),
+        ]
     
     def __str__(self):
         return f"{self.category} - {self.name}"
@@ -30,6 +45,9 @@ class Color(models.Model):
     blue = models.IntegerField(default=0)
     transparency = models.IntegerField(default=100)
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [models.Index(fields=['profile', 'order'])]
     
     def __str__(self):
         return f"{self.order} - {self.red} {self.green} {self.blue} {self.transparency}"
@@ -39,6 +57,11 @@ class ProfileSkill(models.Model):
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
     level = models.IntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'skill'], name='unique_profileskill_profile_skill'),
+        ]
+
 class About(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='about')
     content = models.TextField()
@@ -46,6 +69,7 @@ class About(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [models.Index(fields=['profile', 'order'])]
 
     def __str__(self):
         return f"About {self.order} for {self.profile.name}"
@@ -64,6 +88,7 @@ class Experience(models.Model):
 
     class Meta:
         ordering = ['order']  # Ordonne par ordre décroissant
+        indexes = [models.Index(fields=['profile', 'order'])]
 
     def __str__(self):
         return f"{self.position} at {self.company}"
@@ -83,6 +108,7 @@ class Education(models.Model):
 
     class Meta:
         ordering = ['order']  # Ordonne par ordre décroissant
+        indexes = [models.Index(fields=['profile', 'order'])]
 
     def __str__(self):
         return f"{self.title} at {self.institution}"
@@ -99,6 +125,21 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [models.Index(fields=['profile', 'order'])]
+
+    def __str__(self):
+        return self.title
+
+class PortfolioSnapshot(models.Model):
+    """Données d'un profil déjà assemblées (format de load_data), reconstruites à chaque écriture"""
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    content_version = models.PositiveIntegerField(default=0)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # Catégorie et nom des compétences affichées dans les tuiles, indexés par identifiant
+    skills_index = models.JSONField(default=dict)
+    # Empreinte du contenu de chaque section : clé des fragments de page en cache
+    section_versions = models.JSONField(default=dict)
+    built_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"Snapshot v{self.content_version} for {self.profile.name}"
@@ -0,0 +1,77 @@
+from django.db.models import Q
+
+# Taille de page par défaut et maximale des listes paginées
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class PaginationError(ValueError):
+    """Paramètre de pagination invalide"""
+
+def page_limit(value, default=PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Nombre d'éléments demandés par page, borné par maximum"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError("Le paramètre limit doit être un entier")
+    if limit < 1:
+        raise PaginationError("Le paramètre limit doit être strictement positif")
+    return min(limit, maximum)
+
+def page_after(value, size=1):
+    """Curseur de pagination : clé de tri du dernier élément de la page précédente
+
+    Les valeurs de la clé sont séparées par des points ('3.17' pour (order, id)).
+    Un curseur partiel ('3') reprend après tous les éléments qui commencent par ces valeurs.
+    """
+    if value in (None, ''):
+        return None
+    parts = value.split('.')
+    if len(parts) > size:
+        raise PaginationError("Le paramètre after ne correspond pas à la clé de tri")
+    try:
+        return tuple(int(part) for part in parts)
+    except ValueError:
+        raise PaginationError("Le paramètre after doit être composé d'entiers")
+
+def format_cursor(values):
+    return '.'.join(str(value) for value in values)
+
+def key_values(item, keys):
+    return tuple(item[key] if isinstance(item, dict) else getattr(item, key) for key in keys)
+
+def after_filter(keys, after):
+    """Éléments dont la clé suit after dans l'ordre lexicographique
+
+    (k1 > a1) OU (k1 = a1 ET k2 > a2) ... : une condition qu'un index sur les clés sait parcourir.
+    """
+    condition = Q()
+    for index, value in enumerate(after):
+        equal = dict(zip(keys[:index], after[:index]))
+        condition |= Q(**equal, **{f'{keys[index]}__gt': value})
+    return condition
+
+def page_queryset(queryset, after, limit, keys):
+    if after is not None:
+        queryset = queryset.filter(after_filter(keys, after))
+    # Un élément de plus indique s'il existe une page suivante
+    return queryset.order_by(*keys)[:limit + 1]
+
+def split_page(items, limit, keys):
+    if len(items) <= limit:
+        return items, None
+    return items[:limit], format_cursor(key_values(items[limit - 1], keys))
+
+def keyset_page(queryset, after, limit, keys=('id',)):
+    """Éléments qui suivent le curseur after, triés selon keys
+
+    Renvoie la page et le curseur de la page suivante (None pour la dernière page).
+    La requête filtre sur la clé de tri au lieu de sauter des lignes (OFFSET) :
+    son coût ne dépend pas de la position de la page.
+    """
+    return split_page(list(page_queryset(queryset, after, limit, keys)), limit, keys)
+
+async def akeyset_page(queryset, after, limit, keys=('id',)):
+    """Version asynchrone de keyset_page"""
+    return split_page([item async for item in page_queryset(queryset, after, limit, keys)], limit, keys)
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from django.db.models import F
+import asyncio
+from .models import About, Experience, Education, Project, ProfileSkill, Color
+
+# Champs texte exportés pour chaque section (les valeurs vides sont remplacées par '')
+ABOUT_FIELDS = ('content',)
+EXPERIENCE_FIELDS = ('dates', 'position', 'company', 'location', 'description', 'details', 'url')
+EDUCATION_FIELDS = ('dates', 'institution', 'location', 'title', 'field', 'description', 'details', 'url')
+PROJECT_FIELDS = ('title', 'image_url', 'description', 'details', 'url')
+COLOR_FIELDS = ('red', 'green', 'blue', 'transparency')
+SKILL_FIELDS = ('category', 'name', 'level')
+
+# Sections de load_data : (clé, modèle, champs, avec les compétences)
+SECTIONS = (
+    ('about', About, ABOUT_FIELDS, False),
+    ('experience', Experience, EXPERIENCE_FIELDS, True),
+    ('education', Education, EDUCATION_FIELDS, True),
+    ('projects', Project, PROJECT_FIELDS, True),
+)
+
+# Sections de l'API paginée : (modèle, champs, avec les compétences, clé de tri)
+# Une compétence n'apparaît qu'une fois par profil : son identifiant suffit à trier
+API_SECTIONS = {
+    **{key: (model, fields, with_skills, ('order', 'id')) for key, model, fields, with_skills in SECTIONS},
+    'colors': (Color, COLOR_FIELDS, False, ('order', 'id')),
+    'skills': (ProfileSkill, SKILL_FIELDS, False, ('skill_id',)),
+}
+
+async def alist(queryset):
+    """Évalue un queryset avec l'interface asynchrone de l'ORM"""
+    return [row async for row in queryset]
+
+def skill_links(model, profile):
+    """Liaisons (élément, compétence) d'une section, lues en une seule requête sur la table de liaison"""
+    through = model.skills.through
+    item_field = f'{model._meta.model_name}_id'
+    links = through.objects.filter(**{f'{model._meta.model_name}__profile': profile}).order_by('skill_id')
+    return links.values_list(item_field, 'skill_id')
+
+def skill_ids_by_item(model, profile):
+    """Compétences de chaque élément d'une section"""
+    return group_skill_ids(skill_links(model, profile))
+
+def group_skill_ids(links):
+    skill_ids = defaultdict(list)
+    for item_id, skill_id in links:
+        skill_ids[item_id].append(skill_id)
+    return skill_ids
+
+def section_rows(model, profile, fields):
+    return model.objects.filter(profile=profile).order_by('order').values('id', 'order', *fields)
+
+def format_section(rows, skill_ids, fields):
+    """Éléments d'une section sous forme de dictionnaires, dans l'ordre d'affichage"""
+    items = []
+    for row in rows:
+        item = {'id': row['id'], 'order': row['order']}
+        for field in fields:
+            item[field] = row[field] if row[field] else ''
+        if skill_ids is not None:
+            item['skills'] = skill_ids.get(row['id'], [])
+        items.append(item)
+    return items
+
+def serialize_section(model, profile, fields, with_skills=False):
+    skill_ids = skill_ids_by_item(model, profile) if with_skills else None
+    return format_section(section_rows(model, profile, fields), skill_ids, fields)
+
+async def aserialize_section(model, profile, fields, with_skills=False):
+    """Version asynchrone de serialize_section
+
+    Les deux lectures (éléments et liaisons) sont soumises ensemble, mais Django 4.2 exécute
+    chaque appel asynchrone de l'ORM sur un même fil d'exécution : elles se suivent.
+    """
+    if not with_skills:
+        return format_section(await alist(section_rows(model, profile, fields)), None, fields)
+    rows, links = await asyncio.gather(alist(section_rows(model, profile, fields)), alist(skill_links(model, profile)))
+    return format_section(rows, group_skill_ids(links), fields)
+
+def color_rows(profile):
+    return Color.objects.filter(profile=profile).order_by('order').values('id', 'order', *COLOR_FIELDS)
+
+def format_colors(rows, profile):
+    return [dict(row, profile=profile.id) for row in rows]
+
+def serialize_colors(profile):
+    return format_colors(color_rows(profile), profile)
+
+def skill_rows(profile):
+    return ProfileSkill.objects.filter(profile=profile).order_by('id').values_list('skill_id', 'skill__category', 'skill__name', 'level')
+
+def format_skills(rows):
+    return [
+        {'id': skill_id, 'category': category, 'name': name, 'level': level}
+        for skill_id, category, name, level in rows
+    ]
+
+def serialize_skills(profile):
+    return format_skills(skill_rows(profile))
+
+def serialize_profile(profile):
+    return {
+        'name': profile.name if profile.name else '',
+        'identifiant': profile.identifiant,
+        'title': profile.title if profile.title else '',
+        'id': profile.id,
+        'created_at': profile.created_at,
+        'updated_at': profile.updated_at,
+    }
+
+def serialize_profile_data(profile):
+    """Données complètes d'un profil (format de load_data), en un nombre fixe de requêtes"""
+    return {
+        'profile': serialize_profile(profile),
+        **{key: serialize_section(model, profile, fields, with_skills) for key, model, fields, with_skills in SECTIONS},
+        'colors': serialize_colors(profile),
+        'skills': serialize_skills(profile),
+    }
+
+async def aserialize_profile_data(profile):
+    """Version asynchrone de serialize_profile_data
+
+    Les requêtes sont soumises ensemble avec asyncio.gather, mais exécutées l'une après l'autre
+    sur le fil unique de l'ORM (Django 4.2) : le gain est de libérer la boucle pendant les lectures.
+    """
+    *sections, colors, skills = await asyncio.gather(
+        *(aserialize_section(model, profile, fields, with_skills) for _, model, fields, with_skills in SECTIONS),
+        alist(color_rows(profile)),
+        alist(skill_rows(profile)),
+    )
+    return {
+        'profile': serialize_profile(profile),
+        **{key: items for (key, _, _, _), items in zip(SECTIONS, sections)},
+        'colors': format_colors(colors, profile),
+        'skills': format_skills(skills),
+    }
+
+def api_rows(section, profile, fields):
+    """Lignes d'une section limitées aux champs demandés et à la clé de tri"""
+    model, _, _, keys = API_SECTIONS[section]
+    queryset = model.objects.filter(profile=profile)
+    if section == 'skills':
+        related = {'category': F('skill__category'), 'name': F('skill__name')}
+        return queryset.values(
+            *keys,
+            *(field for field in fields if field not in related),
+            **{field: related[field] for field in fields if field in related}
+        )
+    return queryset.values(*keys, *fields)
+
+def page_skill_links(model, item_ids):
+    """Liaisons (élément, compétence) des seuls éléments d'une page"""
+    through = model.skills.through
+    item_field = f'{model._meta.model_name}_id'
+    links = through.objects.filter(**{f'{item_field}__in': item_ids}).order_by('skill_id')
+    return links.values_list(item_field, 'skill_id')
+
+def format_api_rows(section, rows, fields, skill_ids=None):
+    """Éléments d'une page de l'API, avec leur identifiant et leur ordre"""
+    items = []
+    for row in rows:
+        if section == 'skills':
+            item = {'id': row['skill_id']}
+        else:
+            item = {'id': row['id'], 'order': row['order']}
+        for field in fields:
+            if field == 'skills':
+                item['skills'] = skill_ids.get(row['id'], [])
+            else:
+                item[field] = '' if row[field] is None else row[field]
+        items.append(item)
+    return items
@@ -1,27 +1,105 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.db import models
-from .models import About, Experience, Education, Project, Color, Profile
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from .models import About, Experience, Education, Project, Color, Profile, ProfileSkill, Skill
+from .cache import evict_portfolio, evict_portfolios
 
-def update_order(sender, instance, created, **kwargs):
-    if created:
-        nb_objects = sender.objects.filter(profile=instance.profile).count()
-        if nb_objects > 1:
-            max_order = sender.objects.filter(profile=instance.profile).aggregate(models.Max('order'))['order__max']
-            instance.order = max_order + 1
-        instance.save()
+# Couleurs d'un nouveau profil (rouge, vert, bleu, transparence), remplaçables par le réglage PIERRPGD_DEFAULT_PALETTE
+DEFAULT_PALETTE = [
+    (255, 255, 255, 100),
+    (145, 157, 197, 100),
+    (15, 23, 42, 100),
+]
+
+def default_palette():
+    return getattr(settings, 'PIERRPGD_DEFAULT_PALETTE', DEFAULT_PALETTE)
+
+def last_orders(model, profile_ids):
+    """Ordre du dernier élément de chaque profil indiqué (profils sans élément absents)"""
+    last_order = model.objects.filter(profile=models.OuterRef('pk')).order_by('-order').values('order')[:1]
+    profiles = Profile.objects.filter(pk__in=profile_ids).annotate(last_order=models.Subquery(last_order))
+    if not transaction.get_autocommit():
+        # Verrouille les profils jusqu'au commit : les créations concurrentes ne peuvent pas lire le même maximum
+        profiles = profiles.select_for_update(of=('self',))
+    return {pk: order for pk, order in profiles.values_list('pk', 'last_order') if order is not None}
+
+def assign_order(sender, instance, **kwargs):
+    """Place un nouvel élément à la suite de ceux de son profil, avant l'insertion"""
+    if not instance._state.adding:
+        return
+    max_order = last_orders(sender, [instance.profile_id]).get(instance.profile_id)
+    if max_order is not None:
+        instance.order = max_order + 1
 
 def create_colors_for_profile(sender, instance, created, **kwargs):
     if created:
-        # Crée une ou plusieurs couleurs par défaut
-        Color.objects.create(red=255, green=255, blue=255, transparency=100, profile=instance)
-        Color.objects.create(red=145, green=157, blue=197, transparency=100, profile=instance)
-        Color.objects.create(red=15, green=23, blue=42, transparency=100, profile=instance)
+        # Crée les couleurs par défaut en une seule requête, dans l'ordre de la palette
+        palette = default_palette()
+        Color.objects.bulk_create([
+            Color(profile=instance, order=order, red=red, green=green, blue=blue, transparency=transparency)
+            for order, (red, green, blue, transparency) in enumerate(palette)
+        ])
+
+def skill_profile_ids(skill):
+    """Identifiants des profils qui affichent une compétence"""
+    return Profile.objects.filter(
+        models.Q(skills=skill)
+        | models.Q(experience__skills=skill)
+        | models.Q(education__skills=skill)
+        | models.Q(projects__skills=skill)
+    ).values_list('id', flat=True).distinct()
+
+def touch_profiles(profile_ids):
+    """Invalide les pages en cache et incrémente la version du contenu des profils indiqués"""
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+    evict_portfolios(profile_ids)
+    Profile.objects.filter(id__in=profile_ids).update(
+        content_version=models.F('content_version') + 1,
+        updated_at=timezone.now()
+    )
+
+def evict_profile_cache(sender, instance, **kwargs):
+    evict_portfolio(instance)
+
+def touch_child_profile(sender, instance, **kwargs):
+    touch_profiles([instance.profile_id])
+
+def touch_skill_profiles(sender, instance, **kwargs):
+    touch_profiles(skill_profile_ids(instance))
+
+def touch_m2m_profiles(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        # instance est le profil ou l'élément (Experience, Education, Project)
+        touch_profiles([instance.id if isinstance(instance, Profile) else instance.profile_id])
+    elif model is Profile:
+        touch_profiles(pk_set if pk_set else skill_profile_ids(instance))
+    else:
+        # instance est la compétence, pk_set contient les éléments modifiés
+        items = model.objects.filter(id__in=pk_set) if pk_set else model.objects.filter(skills=instance)
+        touch_profiles(items.values_list('profile_id', flat=True))
 
 # Enregistrement des signaux
 receiver(post_save, sender=Profile)(create_colors_for_profile)
-receiver(post_save, sender=Color)(update_order)
-receiver(post_save, sender=About)(update_order)
-receiver(post_save, sender=Experience)(update_order)
-receiver(post_save, sender=Education)(update_order)
-receiver(post_save, sender=Project)(update_order)
+receiver(pre_save, sender=Color)(assign_order)
+receiver(pre_save, sender=About)(assign_order)
+receiver(pre_save, sender=Experience)(assign_order)
+receiver(pre_save, sender=Education)(assign_order)
+receiver(pre_save, sender=Project)(assign_order)
+
+# Propagation des modifications au profil (version du contenu et cache des pages)
+receiver(post_delete, sender=Profile)(evict_profile_cache)
+# Pas de post_delete sur les éléments : il désactiverait la suppression rapide (une requête par ligne
+# à la suppression d'un profil) ; les vues de suppression et le traitement par lot touchent le profil
+for model in (About, Experience, Education, Project, Color, ProfileSkill):
+    receiver(post_save, sender=model)(touch_child_profile)
+receiver(post_save, sender=Skill)(touch_skill_profiles)
+# Les liaisons d'une compétence supprimée disparaissent en cascade : on les lit avant
+receiver(pre_delete, sender=Skill)(touch_skill_profiles)
+for through in (ProfileSkill, Experience.skills.through, Education.skills.through, Project.skills.through):
+    receiver(m2m_changed, sender=through)(touch_m2m_profiles)
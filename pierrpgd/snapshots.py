@@ -0,0 +1,128 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from .models import Profile, Skill, PortfolioSnapshot
+from .serializers import alist, aserialize_profile_data, serialize_profile, serialize_profile_data
+import hashlib
+import json
+
+TILE_SECTIONS = ('experience', 'education', 'projects')
+# Sections de la page mises en cache séparément ({% cache %} de portfolio.html)
+FRAGMENT_SECTIONS = ('about', 'skills') + TILE_SECTIONS
+# Sections dont dépend la feuille de style theme.css (voir theme_version)
+THEME_SECTIONS = ('colors', 'skills')
+# Sections dont l'empreinte est enregistrée dans le snapshot
+VERSIONED_SECTIONS = tuple(dict.fromkeys(FRAGMENT_SECTIONS + THEME_SECTIONS))
+# Largeur de la jauge d'une compétence par point de niveau (%)
+SKILL_GAUGE_SCALE = 9
+
+def tile_skills(data):
+    """Catégorie et nom des compétences affichées dans les tuiles"""
+    tile_skill_ids = {skill_id for section in TILE_SECTIONS for item in data[section] for skill_id in item['skills']}
+    return Skill.objects.filter(id__in=tile_skill_ids).values('id', 'category', 'name')
+
+def section_versions(data, skills_index):
+    """Empreinte du contenu affiché de chaque section (compétences des tuiles comprises)
+
+    Seules les sections dont le contenu a changé reçoivent une nouvelle version.
+    """
+    versions = {}
+    for section in VERSIONED_SECTIONS:
+        content = data[section]
+        if section in TILE_SECTIONS:
+            skill_ids = sorted({str(skill_id) for item in content for skill_id in item['skills']})
+            content = [content, [skills_index.get(skill_id) for skill_id in skill_ids]]
+        encoded = json.dumps(content, sort_keys=True, cls=DjangoJSONEncoder).encode()
+        versions[section] = hashlib.sha1(encoded).hexdigest()[:16]
+    return versions
+
+def snapshot_defaults(profile, data, skills):
+    # Les champs du profil sont lus avec le snapshot : inutile de les dupliquer
+    del data['profile']
+    skills_index = {str(skill['id']): skill for skill in skills}
+    return {
+        'content_version': profile.content_version,
+        'data': data,
+        'skills_index': skills_index,
+        'section_versions': section_versions(data, skills_index),
+        'built_at': timezone.now(),
+    }
+
+def build_snapshot(profile):
+    """Assemble et enregistre les données du profil pour sa version de contenu courante"""
+    data = serialize_profile_data(profile)
+    snapshot, _ = PortfolioSnapshot.objects.update_or_create(
+        profile=profile, defaults=snapshot_defaults(profile, data, tile_skills(data))
+    )
+    return snapshot
+
+async def abuild_snapshot(profile):
+    """Version asynchrone de build_snapshot"""
+    data = await aserialize_profile_data(profile)
+    skills = await alist(tile_skills(data))
+    snapshot, _ = await PortfolioSnapshot.objects.aupdate_or_create(
+        profile=profile, defaults=snapshot_defaults(profile, data, skills)
+    )
+    return snapshot
+
+def rebuild_snapshots(profile_ids):
+    """Reconstruit les snapshots des profils indiqués, à appeler dans la transaction de l'écriture"""
+    with transaction.atomic():
+        for profile in Profile.objects.filter(id__in=list(profile_ids)):
+            build_snapshot(profile)
+
+def is_stale(profile, snapshot):
+    # Les snapshots antérieurs aux versions de section sont reconstruits
+    return snapshot is None or snapshot.content_version != profile.content_version or not snapshot.section_versions
+
+def current_snapshot(profile):
+    """Snapshot à jour du profil (lu avec select_related('snapshot')), reconstruit s'il est absent ou périmé"""
+    try:
+        snapshot = profile.snapshot
+    except PortfolioSnapshot.DoesNotExist:
+        snapshot = None
+    if is_stale(profile, snapshot):
+        snapshot = build_snapshot(profile)
+    return snapshot
+
+async def acurrent_snapshot(profile):
+    """Version asynchrone de current_snapshot"""
+    try:
+        snapshot = profile.snapshot
+    except PortfolioSnapshot.DoesNotExist:
+        snapshot = None
+    if is_stale(profile, snapshot):
+        snapshot = await abuild_snapshot(profile)
+    return snapshot
+
+def snapshot_data(profile, snapshot):
+    """Données au format de load_data"""
+    return {'profile': serialize_profile(profile), **snapshot.data}
+
+def ordered_skills(snapshot):
+    """Compétences du profil groupées par catégorie, les mieux maîtrisées en premier"""
+    return sorted(snapshot.data['skills'], key=lambda skill: (skill['category'], -skill['level']))
+
+def skill_categories(snapshot):
+    """Compétences regroupées par catégorie pour le menu de la page
+
+    Chaque catégorie porte son rang (couleur de la palette, voir theme.py) et chaque
+    compétence la largeur de sa jauge en pourcentage.
+    """
+    categories = []
+    for skill in ordered_skills(snapshot):
+        if not categories or categories[-1]['name'] != skill['category']:
+            categories.append({'name': skill['category'], 'color_index': len(categories), 'skills': []})
+        categories[-1]['skills'].append(dict(skill, gauge_width=skill['level'] * SKILL_GAUGE_SCALE))
+    return categories
+
+def snapshot_sections(snapshot):
+    """Sections du portfolio avec les compétences de chaque tuile résolues"""
+    sections = {}
+    for section in TILE_SECTIONS:
+        items = []
+        for item in snapshot.data[section]:
+            skill_list = [snapshot.skills_index[str(skill_id)] for skill_id in item['skills'] if str(skill_id) in snapshot.skills_index]
+            items.append(dict(item, skill_list=skill_list))
+        sections[section] = items
+    return sections
@@ -1531,34 +1531,123 @@ function handleProfileSelection(row, profileIdentifiant) {
     return true;
 }
 
-$(function() {
+// Gestion des clics sur une ligne de profil
+function bindProfileRow(row) {
+    // Double clic pour ouvrir la popup
+    row.addEventListener('dblclick', function() {
+        showPopup(row, 'profileModal', 'profileModalContent');
+    });
 
-    // Gestion des clics sur les lignes de profils
-    document.querySelectorAll('.profile-row').forEach(row => {
-        // Double clic pour ouvrir la popup
-        row.addEventListener('dblclick', function() {
-            showPopup(row, 'profileModal', 'profileModalContent');
-        });
+    // Simple clic pour sélectionner le profil
+    row.addEventListener('click', function(e) {
+        // Ne pas traiter si le clic provient d'un bouton de suppression
+        if (e.target.closest('.btn-danger, .delete-profile, .delete-color, .delete-about, .delete-experience, .delete-education, .delete-project, .delete-skill')) {
+            return;
+        }
 
-        // Simple clic pour sélectionner le profil
-        row.addEventListener('click', function(e) {
-            // Ne pas traiter si le clic provient d'un bouton de suppression
-            if (e.target.closest('.btn-danger, .delete-profile, .delete-color, .delete-about, .delete-experience, .delete-education, .delete-project, .delete-skill')) {
-                return;
-            }
+        const profileIdentifiant = this.querySelector('td:first-child').textContent;
 
-            const profileIdentifiant = this.querySelector('td:first-child').textContent;
+        // Gestion de la sélection/déselection d'un profil
+        if (!handleProfileSelection(this, profileIdentifiant)) {
+            return;
+        }
 
-            // Gestion de la sélection/déselection d'un profil
-            if (!handleProfileSelection(this, profileIdentifiant)) {
-                return;
-            }
+        // Charger les données du profil sélectionné
+        loadProfileData(profileIdentifiant);
+    });
+}
 
-            // Charger les données du profil sélectionné
-            loadProfileData(profileIdentifiant);
-        });
+// Création d'une ligne du tableau des profils
+function createProfileRow(profile) {
+    const options = {
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric',
+        hour: 'numeric',
+        minute: '2-digit',
+        hour12: true
+    };
+    const row = document.createElement('tr');
+    row.className = 'profile-row';
+    row.dataset.id = profile.id;
+    row.dataset.identifiant = profile.identifiant;
+    row.dataset.name = profile.name;
+    row.dataset.title = profile.title;
+    row.dataset.created = profile.created_at;
+    row.dataset.updated = profile.updated_at;
+
+    [
+        profile.identifiant,
+        profile.name,
+        profile.title,
+        new Date(profile.created_at).toLocaleString('en-US', options),
+        new Date(profile.updated_at).toLocaleString('en-US', options),
+    ].forEach(value => {
+        const cell = document.createElement('td');
+        cell.textContent = value;
+        row.appendChild(cell);
     });
 
+    const actions = document.createElement('td');
+    actions.className = 'text-end';
+    actions.innerHTML = `
+        <button class="btn btn-danger btn-sm delete-profile" data-id="${profile.id}">
+            <i class="fas fa-trash"></i>
+        </button>
+    `;
+    row.appendChild(actions);
+    return row;
+}
+
+// Chargement progressif des profils au défilement du tableau
+function observeMoreProfiles() {
+    const more = document.querySelector('#profile-table-more');
+    if (!more) return;
+
+    let loading = false;
+    const observer = new IntersectionObserver(async entries => {
+        if (loading || !entries.some(entry => entry.isIntersecting)) return;
+        loading = true;
+        try {
+            const params = new URLSearchParams({q: more.dataset.query, after: more.dataset.after});
+            const response = await fetch(`${more.dataset.url}?${params}`, {credentials: 'same-origin'});
+            if (!response.ok) throw new Error('Network response was not ok');
+            const data = await response.json();
+
+            const profileTable = document.querySelector('#profile-table tbody');
+            data.profiles.forEach(profile => {
+                // Un profil créé pendant le défilement est déjà affiché
+                if (profileTable.querySelector(`tr[data-id="${profile.id}"]`)) return;
+                const row = createProfileRow(profile);
+                profileTable.appendChild(row);
+                bindProfileRow(row);
+            });
+
+            if (data.next === null) {
+                observer.disconnect();
+                more.remove();
+            } else {
+                more.dataset.after = data.next;
+            }
+        } catch (error) {
+            console.error('[observeMoreProfiles] Erreur:', error);
+            observer.disconnect();
+            more.textContent = 'Erreur lors du chargement des profils';
+        } finally {
+            loading = false;
+        }
+    });
+    observer.observe(more);
+}
+
+$(function() {
+
+    // Gestion des clics sur les lignes de profils
+    document.querySelectorAll('.profile-row').forEach(bindProfileRow);
+
+    // Profils suivants chargés à la demande
+    observeMoreProfiles();
+
     // Gestion des modales
     document.body.addEventListener('click', function(e) {
 
@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.template import engines
+import os
+import time
+
+def app_template_names():
+    """Noms des gabarits de l'application (pierrpgd/templates)"""
+    root = os.path.join(apps.get_app_config('pierrpgd').path, 'templates')
+    names = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            names.append(os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/'))
+    return sorted(names)
+
+def warm_templates(names=None):
+    """Compile les gabarits dans le cache du chargeur du processus ; renvoie la durée de compilation de chacun"""
+    engine = engines['django']
+    timings = {}
+    for name in names or app_template_names():
+        start = time.perf_counter()
+        engine.get_template(name)
+        timings[name] = time.perf_counter() - start
+    return timings
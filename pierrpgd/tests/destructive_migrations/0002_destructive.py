@@ -0,0 +1,18 @@
+# Migration factice de CheckMigrationsTest : une opération destructive de chaque sorte
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pierrpgd', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name='legacy', name='note'),
+        migrations.RenameField(model_name='legacy', old_name='label', new_name='title'),
+        migrations.RenameModel(old_name='Legacy', new_name='Current'),
+        migrations.AlterModelTable(name='current', table='pierrpgd_current'),
+        migrations.DeleteModel(name='Obsolete'),
+    ]
@@ -0,0 +1,311 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import engines
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from pierrpgd.loader import BulkLoader, load_in_parts, resolve_skills, split_contiguous
+from pierrpgd.templating import app_template_names, warm_templates
+from pierrpgd.models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
+from io import StringIO
+from unittest import mock
+import json
+import os
+import tempfile
+
+def database_content():
+    """Contenu des profils de la base, ordres et compétences compris, indépendant des IDs"""
+    content = {}
+    for profile in Profile.objects.order_by('identifiant'):
+        content[profile.identifiant] = {
+            'profile': (profile.name, profile.title),
+            'colors': list(Color.objects.filter(profile=profile).order_by('order').values_list('order', 'red', 'green', 'blue', 'transparency')),
+            'skills': sorted(ProfileSkill.objects.filter(profile=profile).values_list('skill__category', 'skill__name', 'level')),
+            'about': list(About.objects.filter(profile=profile).order_by('order').values_list('order', 'content')),
+            **{
+                model._meta.model_name: [
+                    (item.order, item.title if model is not Experience else item.position, sorted(skill.name for skill in item.skills.all()))
+                    for item in model.objects.filter(profile=profile).order_by('order')
+                ]
+                for model in (Experience, Education, Project)
+            },
+        }
+    return content
+
+def person(identifiant, skills=(), experience_skills=()):
+    """Personne minimale au format d'import"""
+    return {
+        'profile': {'name': identifiant, 'identifiant': identifiant, 'title': ''},
+        'colors': [],
+        'skills': [{'category': 'Langages', 'name': name, 'level': 5} for name in skills],
+        'about': [],
+        'experiences': [{
+            'dates': '2024', 'position': 'Poste', 'company': '', 'location': '',
+            'description': '', 'details': '', 'url': '', 'skills': list(experience_skills),
+        }],
+        'educations': [],
+        'projects': [],
+    }
+
+class InitDbTest(TestCase):
+
+    def init_db(self, *args):
+        call_command('init_db', *args, stdout=StringIO(), stderr=StringIO())
+
+    def write_ndjson(self, persons):
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for data in persons:
+                f.write(json.dumps(data) + '\n')
+        self.addCleanup(os.remove, path)
+        return path
+
+    def clear(self):
+        Profile.objects.all().delete()
+        Skill.objects.all().delete()
+
+    def test_bulk_matches_serial(self):
+        """Teste que l'import groupé produit les mêmes lignes, ordres et liaisons que l'import unitaire"""
+        self.init_db()
+        serial = database_content()
+        self.assertEqual(len(serial), 2)
+
+        self.clear()
+        self.init_db('--bulk')
+        self.assertEqual(database_content(), serial)
+
+        # Un paquet par personne : les compétences sont résolues paquet par paquet
+        self.clear()
+        self.init_db('--bulk', '--chunk-size', '1')
+        self.assertEqual(database_content(), serial)
+
+    def test_error_exit_status(self):
+        """Teste qu'une erreur d'import interrompt la commande avec un code de sortie non nul"""
+        with self.assertRaises(CommandError):
+            self.init_db('fichier-inexistant.ndjson')
+        with self.assertRaises(CommandError):
+            self.init_db('fichier-inexistant.ndjson', '--bulk')
+
+    def test_skill_declared_in_earlier_chunk(self):
+        """Teste qu'une section peut nommer une compétence déclarée par une personne d'un paquet précédent"""
+        path = self.write_ndjson([
+            person('a1', skills=['Python'], experience_skills=['Python']),
+            person('b1', experience_skills=['Python']),
+        ])
+        self.init_db(path, '--bulk', '--chunk-size', '1')
+
+        experience = Experience.objects.get(profile__identifiant='b1')
+        self.assertEqual([skill.name for skill in experience.skills.all()], ['Python'])
+        self.assertEqual(Skill.objects.filter(name='Python').count(), 1)
+
+        # Même résultat que l'import unitaire
+        bulk = database_content()
+        self.clear()
+        self.init_db(path)
+        self.assertEqual(database_content(), bulk)
+
+    def test_unknown_section_skill(self):
+        """Teste qu'une compétence inconnue dans une section fait échouer l'import"""
+        path = self.write_ndjson([person('c1', experience_skills=['Inconnue'])])
+        with self.assertRaisesMessage(CommandError, 'Compétence inconnue : Inconnue'):
+            self.init_db(path, '--bulk')
+
+    def test_invalid_chunk_size(self):
+        """Teste qu'une taille de paquet nulle ou négative est refusée avant tout import"""
+        for chunk_size in ('0', '-1'):
+            with self.assertRaisesMessage(CommandError, '--chunk-size'):
+                self.init_db('--bulk', '--chunk-size', chunk_size)
+        self.assertFalse(Profile.objects.exists())
+
+    def test_export_round_trip(self):
+        """Teste qu'un export relu par init_db --upsert depuis l'entrée standard restaure les profils"""
+        self.init_db()
+        content = database_content()
+
+        with mock.patch('sys.stdout', new=StringIO()) as exported:
+            call_command('export_db', stderr=StringIO())
+        self.assertEqual(len(exported.getvalue().splitlines()), len(content))
+
+        # Modifications à annuler : un élément modifié, un supprimé, un ajouté
+        profile = Profile.objects.order_by('id').first()
+        About.objects.filter(profile=profile).update(content='Modifié')
+        Experience.objects.filter(profile=profile).first().delete()
+        Project.objects.create(profile=profile, title='Nouveau', description='')
+        self.assertNotEqual(database_content(), content)
+
+        with mock.patch('sys.stdin', new=StringIO(exported.getvalue())):
+            self.init_db('-', '--upsert')
+        self.assertEqual(database_content(), content)
+
+class WorkerSplitTest(TestCase):
+
+    def test_split_contiguous(self):
+        """Teste le découpage en tranches contiguës de tailles voisines"""
+        self.assertEqual(split_contiguous(list(range(5)), 3), [[0, 1], [2, 3], [4]])
+        self.assertEqual(split_contiguous(list(range(2)), 4), [[0], [1]])
+        self.assertEqual(split_contiguous([], 2), [])
+
+    def test_results_follow_file_order(self):
+        """Teste que les résultats des tranches, concaténés, suivent l'ordre du fichier"""
+        persons = [person(f'w{i}') for i in range(5)]
+        loaded = load_in_parts(map, resolve_skills(persons), persons, 3, False)
+        self.assertEqual([identifiant for identifiant, _, _ in loaded], [f'w{i}' for i in range(5)])
+        self.assertEqual(
+            [profile_id for _, profile_id, _ in loaded],
+            list(Profile.objects.filter(identifiant__startswith='w').order_by('id').values_list('id', flat=True))
+        )
+
+class UpsertTest(TestCase):
+
+    def experience(self, position, skills=()):
+        return {
+            'dates': '2024', 'position': position, 'company': 'Entreprise', 'location': '',
+            'description': '', 'details': '', 'url': '', 'skills': list(skills),
+        }
+
+    def upsert(self, data):
+        return BulkLoader(resolve_skills([data])).upsert(data)
+
+    def person(self, experiences, title=''):
+        data = person('upsert', skills=['Python', 'SQL'])
+        data['profile']['title'] = title
+        data['about'] = ['Bonjour']
+        data['experiences'] = experiences
+        return data
+
+    def experiences(self, profile):
+        return list(Experience.objects.filter(profile=profile).order_by('order').values_list('id', 'order', 'position'))
+
+    def test_created_then_unchanged(self):
+        """Teste que le même fichier importé deux fois ne produit aucune écriture la seconde fois"""
+        data = self.person([self.experience('Développeur', ['Python'])])
+        profile, status = self.upsert(data)
+        self.assertEqual(status, 'created')
+        before = (self.experiences(profile), Profile.objects.get(id=profile.id).content_version)
+
+        profile, status = self.upsert(data)
+        self.assertEqual(status, 'unchanged')
+        self.assertEqual((self.experiences(profile), Profile.objects.get(id=profile.id).content_version), before)
+
+    def test_updated(self):
+        """Teste la mise à jour du profil et la suppression des éléments absents du fichier"""
+        profile, _ = self.upsert(self.person([self.experience('Développeur'), self.experience('Chef de projet')]))
+
+        profile, status = self.upsert(self.person([self.experience('Chef de projet')], title='Nouveau titre'))
+        self.assertEqual(status, 'updated')
+        self.assertEqual(Profile.objects.get(id=profile.id).title, 'Nouveau titre')
+        self.assertEqual([position for _, _, position in self.experiences(profile)], ['Chef de projet'])
+
+    def test_insert_keeps_rows(self):
+        """Teste qu'une expérience insérée en tête ne réécrit que l'ordre des suivantes"""
+        profile, _ = self.upsert(self.person([self.experience('Développeur', ['Python']), self.experience('Chef de projet', ['SQL'])]))
+        (first_id, _, _), (second_id, _, _) = self.experiences(profile)
+
+        profile, status = self.upsert(self.person([
+            self.experience('Stagiaire'),
+            self.experience('Développeur', ['Python']),
+            self.experience('Chef de projet', ['SQL']),
+        ]))
+        self.assertEqual(status, 'updated')
+        rows = self.experiences(profile)
+        self.assertEqual([position for _, _, position in rows], ['Stagiaire', 'Développeur', 'Chef de projet'])
+        self.assertEqual([row_id for row_id, _, _ in rows[1:]], [first_id, second_id])
+        self.assertEqual([order for _, order, _ in rows], [0, 1, 2])
+        self.assertEqual([skill.name for skill in Experience.objects.get(id=first_id).skills.all()], ['Python'])
+        self.assertEqual([skill.name for skill in Experience.objects.get(id=second_id).skills.all()], ['SQL'])
+
+    def test_existing_skill_reused(self):
+        """Teste qu'une compétence déjà en base n'est pas recréée"""
+        skill = Skill.objects.create(category='Langages', name='Python')
+        skills = resolve_skills([person('reuse', skills=['Python'])])
+        self.assertEqual(skills['Langages', 'Python'].id, skill.id)
+        self.assertEqual(Skill.objects.filter(name='Python').count(), 1)
+
+class CheckMigrationsTest(TestCase):
+
+    def check_migrations(self, *args):
+        out = StringIO()
+        call_command('check_migrations', *args, stdout=out)
+        return out.getvalue()
+
+    def test_committed_migrations(self):
+        """Teste que les migrations de l'application ne contiennent aucune opération destructive"""
+        self.assertIn('aucune opération destructive', self.check_migrations('--all'))
+
+    @override_settings(MIGRATION_MODULES={'pierrpgd': 'pierrpgd.tests.destructive_migrations'})
+    def test_destructive_operations(self):
+        """Teste la détection de chaque opération destructive d'une migration non appliquée"""
+        with self.assertRaises(CommandError) as context:
+            self.check_migrations()
+        message = str(context.exception)
+        for description in (
+            'Remove field note from legacy',
+            'Rename field label on legacy to title',
+            'Rename model Legacy to Current',
+            'Rename table for current to pierrpgd_current',
+            'Delete model Obsolete',
+        ):
+            self.assertIn(f'pierrpgd.0002_destructive: {description}', message)
+
+    @override_settings(MIGRATION_MODULES={'pierrpgd': 'pierrpgd.tests.destructive_migrations'})
+    def test_allowed_migration(self):
+        """Teste qu'une migration destructive autorisée avec --allow ne bloque pas le déploiement"""
+        self.assertIn('aucune opération destructive', self.check_migrations('--allow', 'pierrpgd.0002_destructive'))
+
+class MigrateFromBaselineTest(TransactionTestCase):
+    """Base créée par l'ancien build.sh : seule pierrpgd.0001_initial est appliquée"""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('pierrpgd', target)])
+        executor.loader.build_graph()
+        return executor.loader.project_state(('pierrpgd', target)).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_migrate_from_baseline(self):
+        """Teste la migration d'une base au schéma initial jusqu'à la dernière migration"""
+        apps = self.migrate('0001_initial')
+        Profile = apps.get_model('pierrpgd', 'Profile')
+        Skill = apps.get_model('pierrpgd', 'Skill')
+        ProfileSkill = apps.get_model('pierrpgd', 'ProfileSkill')
+        profile = Profile.objects.create(identifiant='ancien', name='Ancien')
+        skills = [Skill.objects.create(category='Langages', name='Python') for _ in range(2)]
+        for skill in skills:
+            ProfileSkill.objects.create(profile=profile, skill=skill, level=5)
+
+        leaf = MigrationExecutor(connection).loader.graph.leaf_nodes('pierrpgd')[0][1]
+        apps = self.migrate(leaf)
+        profile = apps.get_model('pierrpgd', 'Profile').objects.get(identifiant='ancien')
+        self.assertEqual(profile.content_version, 0)
+        self.assertEqual(apps.get_model('pierrpgd', 'ProfileSkill').objects.filter(profile=profile).count(), 1)
+        snapshot = apps.get_model('pierrpgd', 'PortfolioSnapshot').objects.create(profile=profile)
+        self.assertEqual(snapshot.section_versions, {})
+
+class WarmTemplatesTest(TestCase):
+    fixtures = ['test_fixtures.json']
+
+    def setUp(self):
+        self.loader = engines['django'].engine.template_loaders[0]
+        self.loader.reset()
+
+    def test_warm_templates(self):
+        """Teste que tous les gabarits de l'application sont compilés dans le cache du chargeur"""
+        names = app_template_names()
+        self.assertTrue({'base.html', 'data_display.html', 'portfolio.html', 'theme.css'} <= set(names))
+
+        timings = warm_templates()
+        self.assertEqual(list(timings), names)
+        self.assertTrue(set(names) <= set(self.loader.get_template_cache))
+
+    def test_command_reports_each_template(self):
+        """Teste que la commande rend chaque gabarit et rapporte ses durées"""
+        out = StringIO()
+        call_command('warm_templates', '--repeat', '1', stdout=out)
+        lines = out.getvalue().splitlines()
+        for name in app_template_names():
+            line = next(line for line in lines if line.startswith(name))
+            self.assertIn('compilation', line)
+            self.assertIn('premier rendu', line)
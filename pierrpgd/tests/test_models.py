@@ -1,7 +1,9 @@
-from django.test import TestCase
-from django.db import IntegrityError
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
-from pierrpgd.models import Profile, About, Experience, Education, Project, Skill, Color
+from pierrpgd.models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
 
 class BaseTest(TestCase):
     fixtures = ['test_fixtures.json']
@@ -36,6 +38,22 @@ class ProfileModelTest(BaseTest):
         colors = Color.objects.filter(profile=profile)
         self.assertEqual(len(colors), 3)
 
+    def test_profile_creation_colors_order(self):
+        """Test que les couleurs par défaut sont créées en une requête, dans l'ordre de la palette"""
+        with CaptureQueriesContext(connection) as queries:
+            profile = Profile.objects.create(name='Test Profile New', identifiant='test-profile-new', title='Test Title New')
+        color_inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "pierrpgd_color"')]
+        self.assertEqual(len(color_inserts), 1)
+        self.assertEqual(list(Color.objects.filter(profile=profile).order_by('order').values_list('order', flat=True)), [0, 1, 2])
+
+    @override_settings(PIERRPGD_DEFAULT_PALETTE=[(1, 2, 3, 50)])
+    def test_profile_creation_custom_palette(self):
+        """Test la création des couleurs à partir d'une palette configurée"""
+        profile = Profile.objects.create(name='Test Profile New', identifiant='test-profile-new', title='Test Title New')
+        colors = Color.objects.filter(profile=profile)
+        self.assertEqual(len(colors), 1)
+        self.assertEqual((colors[0].red, colors[0].green, colors[0].blue, colors[0].transparency), (1, 2, 3, 50))
+
     def test_profile_creation_with_same_identifiant(self):
         """Test que la création d'un profil avec un identifiant déjà existant échoue"""
         with self.assertRaises(IntegrityError):
@@ -146,6 +164,15 @@ class AboutModelTest(BaseTest):
         self.assertEqual(abouts[0], self.abouts[0])
         self.assertEqual(abouts[1], self.abouts[1])
 
+    def test_about_order_on_creation(self):
+        """Test que l'ordre d'une nouvelle section est attribué à l'insertion, sans second enregistrement"""
+        last_order = self.abouts.last().order
+        with CaptureQueriesContext(connection) as queries:
+            about = About.objects.create(profile=self.profile, content='Nouvelle section')
+        self.assertEqual(about.order, last_order + 1)
+        self.assertEqual(About.objects.get(id=about.id).order, last_order + 1)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE "pierrpgd_about"')]), 0)
+
     def test_about_deletion(self):
         """Test la suppression d'une section About"""
         about_id = self.abouts[0].id
@@ -360,4 +387,29 @@ class SkillModelTest(BaseTest):
         # Test les deux champs vides
         with self.assertRaises(ValidationError):
             skill = Skill(category='', name='')
-            skill.full_clean()
\ No newline at end of file
+            skill.full_clean()
+
+    def test_skill_unique_category_name(self):
+        """Test qu'une compétence ne peut exister qu'une fois par catégorie et nom"""
+        skill = self.skills[0]
+        with self.assertRaises(IntegrityError):
+            Skill.objects.create(category=skill.category, name=skill.name)
+
+    def test_profile_skill_unique(self):
+        """Test qu'un profil ne peut avoir qu'un niveau par compétence"""
+        skill = Skill.objects.create(category='Test', name='Unique')
+        ProfileSkill.objects.create(profile=self.profile, skill=skill, level=3)
+        with self.assertRaises(IntegrityError):
+            ProfileSkill.objects.create(profile=self.profile, skill=skill, level=5)
+
+class DatabaseTuningTest(TestCase):
+
+    def test_sqlite_pragmas_applied(self):
+        """Test que les PRAGMA configurés sont appliqués à la connexion SQLite"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Réglages propres à SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['cache_size'])
@@ -1,9 +1,21 @@
-from django.test import TestCase
+from django.conf import settings
+from django.test import RequestFactory, TestCase
 from django.urls import resolve, reverse
-from django.http import HttpRequest
-from pierrpgd.views import portfolio, data_display
-from pierrpgd.models import Profile, About, Experience, Education,Project, Skill, ProfileSkill, Color
+from django.http import HttpRequest, HttpResponse
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pierrpgd.views import portfolio, data_display, theme_css
+from pierrpgd.cache import FORMAT_VERSIONS, LOAD_DATA, PORTFOLIO, SKILLS, profile_cache_key
+from pierrpgd.models import Profile, About, Experience, Education,Project, Skill, ProfileSkill, Color, PortfolioSnapshot
+from asgiref.sync import async_to_sync, sync_to_async
+from pierrpgd.serializers import aserialize_profile_data, serialize_profile_data
+from pierrpgd.snapshots import SKILL_GAUGE_SCALE, current_snapshot, skill_categories
+from pierrpgd.theme import rgb_to_hsl, theme_version
+from portfolios.replica import ReplicaMiddleware, ReplicaRouter
 from bs4 import BeautifulSoup
+from unittest import mock
 from datetime import datetime
 
 class BaseTest(TestCase):
@@ -21,6 +33,10 @@ class BaseTest(TestCase):
         cls.colors = Color.objects.filter(profile=cls.profile)
         cls.profile_skills = ProfileSkill.objects.filter(profile=cls.profile)
 
+    def setUp(self):
+        # Les pages mises en cache ne survivent pas au rollback de la base
+        cache.clear()
+
     @classmethod
     def tearDownClass(cls):
         if hasattr(cls, 'user'):
@@ -29,8 +45,10 @@ class BaseTest(TestCase):
 
 class PortfolioViewTest(BaseTest):
     def setUp(self):
+        super().setUp()
         self.request = HttpRequest()
-        self.response = portfolio(self.request, self.profile.identifiant)
+        # La vue est asynchrone : exécutée ici dans sa propre boucle d'événements
+        self.response = async_to_sync(portfolio)(self.request, self.profile.identifiant)
         self.soup = BeautifulSoup(self.response.content, "html.parser")
 
     def test_url_resolves_to_portfolio(self):
@@ -40,6 +58,7 @@ class PortfolioViewTest(BaseTest):
 
     def test_portfolio_returns_correct_html(self):
         """Teste que la page d'accueil retourne le bon HTML"""
+        cache.clear()
         self.response = self.client.get(f'/{self.profile.identifiant}/')
         self.assertEqual(self.response.status_code, 200)
         self.assertTemplateUsed(self.response, 'portfolio.html')
@@ -132,8 +151,398 @@ class PortfolioViewTest(BaseTest):
         self.response = self.client.get(reverse('portfolio', args=['non-existent']))
         self.assertEqual(self.response.status_code, 404)
 
+class PortfolioCacheTest(BaseTest):
+
+    def test_portfolio_served_from_cache(self):
+        """Teste qu'une page déjà rendue est servie depuis le cache"""
+        first = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertTemplateUsed(first, 'portfolio.html')
+
+        # Seule la lecture du profil est nécessaire
+        with self.assertNumQueries(1):
+            second = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_previous_format_ignored(self):
+        """Teste qu'une donnée en cache d'un format précédent n'est pas lue"""
+        profile = Profile.objects.get(id=self.profile.id)
+        key = profile_cache_key(SKILLS, profile.identifiant, profile.updated_at)
+        previous = key.replace(f':v{FORMAT_VERSIONS[SKILLS]}:', f':v{FORMAT_VERSIONS[SKILLS] - 1}:')
+        self.assertNotEqual(previous, key)
+        # Ancienne forme : liste plate des compétences
+        cache.set(previous, [{'id': 0, 'category': 'Ancienne', 'name': 'Forme', 'level': 1}])
+
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Ancienne')
+        self.assertIsInstance(cache.get(key)[0]['skills'], list)
+
+    def test_cache_evicted_on_child_save(self):
+        """Teste que la modification d'un élément invalide la page en cache"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+
+        about = self.abouts[0]
+        about.content = 'Contenu modifié'
+        about.save()
+
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertIn('Contenu modifié', response.content.decode())
+
+    def test_cache_evicted_on_skill_save(self):
+        """Teste que la modification d'une compétence invalide les pages qui l'affichent"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+
+        skill = self.profile_skills[0].skill
+        skill.name = 'Compétence renommée'
+        skill.save()
+
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertIn('Compétence renommée', response.content.decode())
+
+    def test_cache_evicted_on_skill_removal(self):
+        """Teste que le retrait d'une compétence du profil invalide la page en cache"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+
+        skill = self.profile_skills[0].skill
+        self.client.delete(reverse('delete_skill', args=[self.profile.identifiant, skill.id]))
+
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        soup = BeautifulSoup(response.content, 'html.parser')
+        names = [badge.text for badge in soup.find(id='skills').find_all(class_='skill-badge')]
+        self.assertNotIn(skill.name, names)
+
+class QueryCountTest(BaseTest):
+    # Lecture du profil jointe à ses données assemblées
+    MAX_QUERIES = 1
+
+    def count_queries(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def add_profile_data(self):
+        skills = [Skill.objects.create(category=f'Catégorie {i % 3}', name=f'Compétence {i}') for i in range(10)]
+        for skill in skills:
+            ProfileSkill.objects.create(profile=self.profile, skill=skill, level=5)
+        for i in range(5):
+            About.objects.create(profile=self.profile, content=f'About {i}')
+            Experience.objects.create(profile=self.profile, company=f'Entreprise {i}', dates='2024').skills.add(*skills)
+            Education.objects.create(profile=self.profile, institution=f'École {i}', dates='2024').skills.add(*skills)
+            Project.objects.create(profile=self.profile, title=f'Projet {i}').skills.add(*skills)
+            Color.objects.create(profile=self.profile, red=i, green=i, blue=i)
+        return skills
+
+    def assert_query_count_is_bounded(self, url, params=None):
+        # Première lecture : les données du profil sont assemblées
+        self.count_queries(url, params)
+        self.assertLessEqual(self.count_queries(url, params), self.MAX_QUERIES)
+
+        # Une modification invalide les données assemblées, reconstruites à la lecture suivante
+        self.abouts[0].save()
+        build_queries = self.count_queries(url, params)
+
+        self.add_profile_data()
+
+        # Le coût de l'assemblage ne dépend pas du volume de données
+        self.assertEqual(self.count_queries(url, params), build_queries)
+        self.assertLessEqual(self.count_queries(url, params), self.MAX_QUERIES)
+
+    def test_portfolio_query_count_is_bounded(self):
+        """Teste que le nombre de requêtes de la page portfolio ne dépend pas du volume de données du profil"""
+        self.assert_query_count_is_bounded(reverse('portfolio', args=[self.profile.identifiant]))
+
+    def test_load_data_query_count_is_bounded(self):
+        """Teste que load_data s'exécute en un nombre fixe de requêtes"""
+        self.assert_query_count_is_bounded(reverse('load_data'), {'identifiant': self.profile.identifiant})
+
+    def test_load_data_content(self):
+        """Teste les compétences et couleurs renvoyées par load_data pour un profil volumineux"""
+        skills = self.add_profile_data()
+
+        data = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}).json()
+        self.assertEqual(data['projects'][-1]['skills'], [skill.id for skill in skills])
+        self.assertEqual(data['colors'][-1]['profile'], self.profile.id)
+
+class SnapshotTest(BaseTest):
+
+    def test_snapshot_built_on_save(self):
+        """Teste que save_data reconstruit les données assemblées du profil"""
+        self.client.post(
+            reverse('save_data'),
+            {'modalId': 'aboutModal', 'isNew': True, 'data': {'content': 'Nouveau paragraphe', 'profile': self.profile.identifiant}},
+            content_type='application/json'
+        )
+
+        profile = Profile.objects.get(id=self.profile.id)
+        snapshot = PortfolioSnapshot.objects.get(profile=profile)
+        self.assertEqual(snapshot.content_version, profile.content_version)
+        self.assertIn('Nouveau paragraphe', [about['content'] for about in snapshot.data['about']])
+
+    def test_snapshot_rebuilt_on_delete(self):
+        """Teste que les vues de suppression reconstruisent les données assemblées du profil"""
+        project_id = self.projects[0].id
+        self.client.delete(reverse('delete_project', args=[project_id]))
+
+        snapshot = PortfolioSnapshot.objects.get(profile=self.profile)
+        self.assertNotIn(project_id, [project['id'] for project in snapshot.data['projects']])
+
+    def test_stale_snapshot_rebuilt_on_read(self):
+        """Teste qu'une modification hors des vues est prise en compte à la lecture suivante"""
+        self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant})
+
+        About.objects.create(profile=self.profile, content='Ajouté directement')
+
+        data = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}).json()
+        self.assertIn('Ajouté directement', [about['content'] for about in data['about']])
+
+class AsyncViewTest(BaseTest):
+
+    async def test_portfolio_async_client(self):
+        """Teste la page portfolio servie par la vue asynchrone"""
+        response = await self.async_client.get(f'/{self.profile.identifiant}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.profile.name)
+
+    async def test_load_data_async_client(self):
+        """Teste les données renvoyées par la vue load_data asynchrone"""
+        response = await self.async_client.get(reverse('load_data'), {'identifiant': self.profile.identifiant})
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data['profile']['identifiant'], self.profile.identifiant)
+        self.assertEqual(len(data['experience']), await Experience.objects.filter(profile=self.profile).acount())
+        self.assertEqual(len(data['skills']), await ProfileSkill.objects.filter(profile=self.profile).acount())
+
+    async def test_async_serialization_matches_sync(self):
+        """Teste que la sérialisation asynchrone (requêtes soumises ensemble) équivaut à la synchrone"""
+        profile = await Profile.objects.aget(id=self.profile.id)
+        self.assertEqual(await aserialize_profile_data(profile), await sync_to_async(serialize_profile_data)(profile))
+
+class ReplicaRoutingTest(BaseTest):
+
+    def route(self, path, method='get', write=False):
+        """Base de données choisie pour une lecture pendant une requête, après une écriture éventuelle"""
+        router = ReplicaRouter()
+        used = []
+
+        def get_response(request):
+            if write:
+                router.db_for_write(Profile)
+            used.append(router.db_for_read(Profile))
+            return HttpResponse()
+
+        ReplicaMiddleware(get_response)(getattr(RequestFactory(), method)(path))
+        return used[0]
+
+    def test_read_views_use_replica(self):
+        """Teste que les vues publiques lisent la réplique lorsqu'elle est configurée"""
+        with mock.patch.dict(settings.DATABASES, replica=settings.DATABASES['default']):
+            self.assertEqual(self.route(f'/{self.profile.identifiant}/'), 'replica')
+            self.assertEqual(self.route(reverse('load_data')), 'replica')
+            self.assertEqual(self.route(reverse('data_display')), 'replica')
+
+    def test_writes_use_primary(self):
+        """Teste que les vues d'écriture et les lectures suivant une écriture utilisent la base principale"""
+        with mock.patch.dict(settings.DATABASES, replica=settings.DATABASES['default']):
+            self.assertEqual(self.route(reverse('save_data'), method='post'), 'default')
+            self.assertEqual(self.route(f'/{self.profile.identifiant}/', write=True), 'default')
+            self.assertEqual(ReplicaRouter().db_for_write(Profile), 'default')
+
+    def test_without_replica(self):
+        """Teste que toutes les lectures utilisent la base principale sans réplique configurée"""
+        self.assertNotIn('replica', settings.DATABASES)
+        self.assertEqual(self.route(f'/{self.profile.identifiant}/'), 'default')
+
+class FragmentCacheTest(BaseTest):
+
+    def fragment(self, section):
+        snapshot = PortfolioSnapshot.objects.get(profile=self.profile)
+        version = snapshot.section_versions[section]
+        return version, cache.get(make_template_fragment_key(f'portfolio_{section}', [self.profile.id, FORMAT_VERSIONS[PORTFOLIO], version]))
+
+    def test_sections_cached(self):
+        """Teste que chaque section de la page est mise en cache séparément"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        for section in ('skills', 'about', 'experience', 'education', 'projects'):
+            self.assertIsNotNone(self.fragment(section)[1], section)
+
+    def test_only_edited_section_changes(self):
+        """Teste que la modification d'une expérience ne change que la version de cette section"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        about_version, about_fragment = self.fragment('about')
+        experience_version, _ = self.fragment('experience')
+
+        self.client.post(
+            reverse('save_data'),
+            {'modalId': 'experienceModal', 'isNew': False, 'data': {'id': self.experiences[0].id, 'position': 'Poste modifié'}},
+            content_type='application/json'
+        )
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertContains(response, 'Poste modifié')
+
+        self.assertEqual(self.fragment('about'), (about_version, about_fragment))
+        new_version, new_fragment = self.fragment('experience')
+        self.assertNotEqual(new_version, experience_version)
+        self.assertIn('Poste modifié', new_fragment)
+
+    def test_fragment_versioned_by_format(self):
+        """Teste qu'un fragment rendu par le gabarit d'avant le déploiement n'est plus lu"""
+        self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        version, _ = self.fragment('about')
+        cache.set(make_template_fragment_key('portfolio_about', [self.profile.id, FORMAT_VERSIONS[PORTFOLIO], version]), 'Ancien fragment')
+
+        with mock.patch.dict(FORMAT_VERSIONS, {PORTFOLIO: FORMAT_VERSIONS[PORTFOLIO] + 1}):
+            response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+            self.assertNotContains(response, 'Ancien fragment')
+            self.assertIsNotNone(self.fragment('about')[1])
+
+class SkillCategoriesTest(BaseTest):
+
+    def test_skill_categories(self):
+        """Teste le regroupement des compétences par catégorie, les mieux maîtrisées en premier"""
+        categories = skill_categories(current_snapshot(self.profile))
+        self.assertEqual([category['name'] for category in categories], sorted({ps.skill.category for ps in self.profile_skills}))
+        self.assertEqual([category['color_index'] for category in categories], list(range(len(categories))))
+        for category in categories:
+            levels = [skill['level'] for skill in category['skills']]
+            self.assertEqual(levels, sorted(levels, reverse=True))
+            for skill in category['skills']:
+                self.assertEqual(skill['category'], category['name'])
+                self.assertEqual(skill['gauge_width'], skill['level'] * SKILL_GAUGE_SCALE)
+
+    def test_gauges_rendered(self):
+        """Teste que la page affiche les jauges précalculées de chaque compétence"""
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        soup = BeautifulSoup(response.content, 'html.parser')
+        gauges = soup.select('#skills .skill-level-gauge')
+        self.assertEqual(len(gauges), len(self.profile_skills))
+        widths = sorted(gauge['style'] for gauge in gauges)
+        self.assertEqual(widths, sorted(f'width: {ps.level * SKILL_GAUGE_SCALE}%' for ps in self.profile_skills))
+
+class ThemeTest(BaseTest):
+
+    def test_theme_linked_from_portfolio(self):
+        """Teste que la page portfolio charge la feuille de style versionnée du profil"""
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        snapshot = PortfolioSnapshot.objects.get(profile=self.profile)
+        self.assertContains(response, f"{reverse('theme_css', args=[self.profile.identifiant])}?v={theme_version(snapshot)}")
+
+    def test_theme_content(self):
+        """Teste les couleurs du profil et de chaque catégorie de compétences dans la feuille de style"""
+        response = self.client.get(reverse('theme_css', args=[self.profile.identifiant]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css; charset=utf-8')
+
+        colors = list(Color.objects.filter(profile=self.profile).order_by('order'))
+        content = response.content.decode()
+        self.assertIn(f'--palette-1: rgba({colors[0].red}, {colors[0].green}, {colors[0].blue}', content)
+        categories = sorted({ps.skill.category for ps in self.profile_skills})
+        for category in categories[:len(colors) - 3]:
+            self.assertIn(f'.skill-badge[data-category="{category}"]', content)
+
+    def test_theme_identifiant_not_written(self):
+        """Teste qu'un identifiant contenant une fin de commentaire n'injecte rien dans la feuille de style"""
+        identifiant = 'x*/body{display:none}/*'
+        Profile.objects.filter(id=self.profile.id).update(identifiant=identifiant)
+        # Appel direct : l'URL n'accepte pas de barre oblique, la vue ne doit pas en dépendre
+        response = async_to_sync(theme_css)(RequestFactory().get('/theme.css'), identifiant)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('display:none', response.content.decode())
+
+    def test_theme_caching_headers(self):
+        """Teste la mise en cache longue de l'URL versionnée et la revalidation de l'URL simple"""
+        response = self.client.get(reverse('theme_css', args=[self.profile.identifiant]))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        version = theme_version(PortfolioSnapshot.objects.get(profile=self.profile))
+        response = self.client.get(reverse('theme_css', args=[self.profile.identifiant]), {'v': version})
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get(reverse('theme_css', args=[self.profile.identifiant]), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_theme_version_changes_with_colors(self):
+        """Teste que la modification d'une couleur change la version de la feuille de style"""
+        self.client.get(reverse('theme_css', args=[self.profile.identifiant]))
+        version = theme_version(PortfolioSnapshot.objects.get(profile=self.profile))
+
+        color = Color.objects.filter(profile=self.profile).first()
+        color.red = (color.red + 1) % 256
+        color.save()
+        self.client.get(reverse('theme_css', args=[self.profile.identifiant]))
+        self.assertNotEqual(theme_version(PortfolioSnapshot.objects.get(profile=self.profile)), version)
+
+    def test_rgb_to_hsl(self):
+        """Teste la conversion en HSL, identique à celle de color-convert"""
+        self.assertEqual(rgb_to_hsl(15, 23, 42), (222, 47, 11))
+        self.assertEqual(rgb_to_hsl(255, 255, 255), (0, 0, 100))
+        self.assertEqual(rgb_to_hsl(255, 0, 0), (0, 100, 50))
+
+class ConditionalGetTest(BaseTest):
+
+    def test_portfolio_validators(self):
+        """Teste que la page portfolio est validée par un ETag seulement"""
+        response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_format_version_changes_etag(self):
+        """Teste qu'un changement de format au déploiement invalide l'ETag des clients"""
+        for name, namespace in (('portfolio', PORTFOLIO), ('load_data', LOAD_DATA)):
+            url = reverse(name, args=[self.profile.identifiant]) if name == 'portfolio' else reverse(name)
+            params = {} if name == 'portfolio' else {'identifiant': self.profile.identifiant}
+            etag = self.client.get(url, params)['ETag']
+
+            with mock.patch.dict(FORMAT_VERSIONS, {namespace: FORMAT_VERSIONS[namespace] + 1}):
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_portfolio_not_modified(self):
+        """Teste qu'un client à jour reçoit une réponse 304 sans requête supplémentaire"""
+        etag = self.client.get(reverse('portfolio', args=[self.profile.identifiant]))['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('portfolio', args=[self.profile.identifiant]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_load_data_not_modified(self):
+        """Teste que load_data répond 304 tant que le profil n'a pas changé"""
+        etag = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant})['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_child_change_updates_version(self):
+        """Teste que la modification d'un élément lié change la version du profil et l'ETag"""
+        etag = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant})['ETag']
+        version = Profile.objects.get(id=self.profile.id).content_version
+
+        self.client.delete(reverse('delete_experience', args=[self.experiences[0].id]))
+
+        self.assertGreater(Profile.objects.get(id=self.profile.id).content_version, version)
+        response = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_skill_link_updates_version(self):
+        """Teste que le retrait d'une compétence d'un projet change la version du profil"""
+        version = Profile.objects.get(id=self.profile.id).content_version
+        project = self.projects[0]
+
+        project.skills.remove(project.skills.first())
+
+        self.assertGreater(Profile.objects.get(id=self.profile.id).content_version, version)
+
 class DataDisplayViewTest(BaseTest):
     def setUp(self):
+        super().setUp()
         self.request = HttpRequest()
         self.response = data_display(self.request)
         self.soup = BeautifulSoup(self.response.content, 'html.parser')
@@ -187,6 +596,171 @@ class DataDisplayViewTest(BaseTest):
         self.assertIn('Aucun profil trouvé', profile_table_container.text)
         self.assertIn('Sélectionnez un profil pour voir ses données', profile_data.text)
 
+class ProfileListingTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.others = [
+            Profile.objects.create(identifiant=f'liste-{i}', name=f'Profil {i}', title='Titre')
+            for i in range(5)
+        ]
+
+    def test_data_display_paginated(self):
+        """Teste que data_display n'affiche qu'une page de profils et l'élément de chargement de la suite"""
+        response = self.client.get(reverse('data_display'), {'limit': 2})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        rows = soup.select('#profile-table tbody tr')
+        first_ids = list(Profile.objects.order_by('id').values_list('id', flat=True)[:2])
+        self.assertEqual([int(row['data-id']) for row in rows], first_ids)
+
+        more = soup.find(id='profile-table-more')
+        self.assertEqual(more['data-after'], str(first_ids[-1]))
+        self.assertEqual(more['data-url'], reverse('list_profiles'))
+
+    def test_last_page(self):
+        """Teste que la dernière page n'a pas d'élément de chargement de la suite"""
+        response = self.client.get(reverse('data_display'))
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.select('#profile-table tbody tr')), Profile.objects.count())
+        self.assertIsNone(soup.find(id='profile-table-more'))
+
+    def test_list_profiles_keyset(self):
+        """Teste le parcours complet de la liste JSON, page par page"""
+        identifiants = []
+        after = ''
+        while after is not None:
+            data = self.client.get(reverse('list_profiles'), {'after': after, 'limit': 2}).json()
+            self.assertLessEqual(len(data['profiles']), 2)
+            identifiants += [profile['identifiant'] for profile in data['profiles']]
+            after = data['next']
+        self.assertEqual(identifiants, list(Profile.objects.order_by('id').values_list('identifiant', flat=True)))
+
+    def test_search_prefix(self):
+        """Teste la recherche par préfixe de l'identifiant ou du nom, sans tenir compte de la casse"""
+        data = self.client.get(reverse('list_profiles'), {'q': 'LISTE-3'}).json()
+        self.assertEqual([profile['id'] for profile in data['profiles']], [self.others[3].id])
+
+        data = self.client.get(reverse('list_profiles'), {'q': 'profil'}).json()
+        self.assertEqual(len(data['profiles']), 5)
+        self.assertIsNone(data['next'])
+
+        response = self.client.get(reverse('data_display'), {'q': 'inconnu'})
+        self.assertContains(response, 'Aucun profil trouvé')
+
+    def test_invalid_parameters(self):
+        """Teste le refus des paramètres de pagination invalides"""
+        response = self.client.get(reverse('list_profiles'), {'after': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+        response = self.client.get(reverse('list_profiles'), {'limit': 0})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('data_display'), {'limit': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+class SectionApiTest(BaseTest):
+
+    def url(self, section, identifiant=None):
+        return reverse('section_api', args=[identifiant or self.profile.identifiant, section])
+
+    def test_pages_follow_order(self):
+        """Teste le parcours des projets page par page, dans l'ordre (order, id)"""
+        for i in range(4):
+            Project.objects.create(profile=self.profile, title=f'Projet {i}', order=1)
+
+        ids = []
+        after = ''
+        while after is not None:
+            data = self.client.get(self.url('projects'), {'after': after, 'limit': 2}).json()
+            self.assertLessEqual(len(data['items']), 2)
+            ids += [item['id'] for item in data['items']]
+            after = data['next']
+
+        expected = Project.objects.filter(profile=self.profile).order_by('order', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_after_order_only(self):
+        """Teste qu'un curseur réduit à l'ordre reprend après tous les éléments de cet ordre"""
+        first = Experience.objects.filter(profile=self.profile).order_by('order').first()
+        data = self.client.get(self.url('experience'), {'after': first.order}).json()
+        self.assertTrue(all(item['order'] > first.order for item in data['items']))
+
+    def test_fields(self):
+        """Teste que seuls les champs demandés sont renvoyés, avec l'identifiant et l'ordre"""
+        data = self.client.get(self.url('experience'), {'fields': 'position,skills'}).json()
+        experience = Experience.objects.filter(profile=self.profile).order_by('order', 'id').first()
+        item = data['items'][0]
+        self.assertEqual(set(item), {'id', 'order', 'position', 'skills'})
+        self.assertEqual(item['position'], experience.position)
+        self.assertEqual(item['skills'], sorted(experience.skills.values_list('id', flat=True)))
+
+    def test_always_returned_fields(self):
+        """Teste que l'identifiant et l'ordre, toujours renvoyés, sont acceptés dans fields"""
+        data = self.client.get(self.url('experience'), {'fields': 'id,order,position'}).json()
+        self.assertEqual(set(data['items'][0]), {'id', 'order', 'position'})
+
+        data = self.client.get(self.url('projects'), {'fields': 'id'}).json()
+        self.assertEqual(set(data['items'][0]), {'id', 'order'})
+
+        data = self.client.get(self.url('skills'), {'fields': 'id,name'}).json()
+        self.assertEqual(set(data['items'][0]), {'id', 'name'})
+        self.assertEqual(self.client.get(self.url('skills'), {'fields': 'order'}).status_code, 400)
+
+    def test_same_items_as_load_data(self):
+        """Teste que chaque section de l'API renvoie les mêmes éléments que load_data"""
+        data = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}).json()
+        for section in ('about', 'experience', 'education', 'projects', 'colors'):
+            items = self.client.get(self.url(section), {'limit': 200}).json()['items']
+            expected = [{key: value for key, value in item.items() if key != 'profile'} for item in data[section]]
+            self.assertEqual(items, expected, section)
+
+        skills = self.client.get(self.url('skills'), {'limit': 200}).json()['items']
+        self.assertEqual(skills, sorted(data['skills'], key=lambda skill: skill['id']))
+
+    def test_errors(self):
+        """Teste les réponses d'erreur de l'API"""
+        self.assertEqual(self.client.get(self.url('inconnue')).status_code, 404)
+        self.assertEqual(self.client.get(self.url('projects', 'profil-inconnu')).status_code, 404)
+
+        response = self.client.get(self.url('projects'), {'fields': 'title,inconnu'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('inconnu', response.json()['error'])
+
+        self.assertEqual(self.client.get(self.url('projects'), {'after': '1.2.3'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url('colors'), {'fields': 'skills'}).status_code, 400)
+        self.assertEqual(self.client.post(self.url('projects')).status_code, 405)
+
+    def test_not_modified(self):
+        """Teste la revalidation d'une page de l'API par son ETag"""
+        response = self.client.get(self.url('projects'))
+        etag = response['ETag']
+        response = self.client.get(self.url('projects'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Paramètres équivalents : même page, même ETag
+        response = self.client.get(self.url('projects'), {'limit': 50}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_per_page(self):
+        """Teste que deux pages ou deux choix de champs n'ont pas le même ETag"""
+        for _ in range(3):
+            Project.objects.create(profile=self.profile, title='Projet')
+        first = self.client.get(self.url('projects'), {'limit': 1})
+        etag = first['ETag']
+
+        for params in ({'limit': 1, 'after': first.json()['next']}, {'limit': 2}, {'limit': 1, 'fields': 'title'}):
+            response = self.client.get(self.url('projects'), params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, params)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalid_request_not_revalidated(self):
+        """Teste qu'une requête invalide est refusée même avec un ETag valide"""
+        etag = self.client.get(self.url('projects'))['ETag']
+        response = self.client.get(self.url('projects'), {'fields': 'inconnu'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url('projects'), {'after': 'abc'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 400)
+
 class LoadDataViewTest(BaseTest):
 
     def test_create_profile(self):
@@ -1299,6 +1873,15 @@ class DeleteDataTest(BaseTest):
         self.assertFalse(Experience.objects.filter(profile=self.profile).exists())
         self.assertFalse(Project.objects.filter(profile=self.profile).exists())
 
+    def test_delete_profile_query_count(self):
+        """Teste que la suppression d'un profil ne dépend pas du nombre de ses éléments"""
+        About.objects.bulk_create([About(profile=self.profile, content=f'Ligne {order}', order=order) for order in range(300)])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('delete_profile', args=[self.profile.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 30)
+
     def test_delete_about(self):
         """Teste la suppression d'un About"""
 
@@ -1419,3 +2002,175 @@ class DeleteDataTest(BaseTest):
         # Vérifier que le profil a été supprimé
         self.assertEqual(result['success'], True)
         self.assertFalse(Color.objects.filter(id=color_id).exists())
+
+class SaveBatchTest(BaseTest):
+
+    def post_batch(self, operations):
+        return self.client.post(reverse('save_batch'), {'operations': operations}, content_type='application/json')
+
+    def test_batch_operations(self):
+        """Teste l'application d'un lot d'opérations sur plusieurs types d'éléments"""
+        about_id = self.abouts[0].id
+        project_id = self.projects[0].id
+        response = self.post_batch([
+            {'op': 'create', 'type': 'about', 'data': {'content': 'Nouveau 1', 'profile': self.profile.identifiant}},
+            {'op': 'create', 'type': 'about', 'data': {'content': 'Nouveau 2', 'profile': self.profile.identifiant}},
+            {'op': 'update', 'type': 'about', 'data': {'id': about_id, 'content': 'Modifié'}},
+            {'op': 'create', 'type': 'experience', 'data': {'company': 'Entreprise', 'dates': '2025', 'skills': [self.skills[0].id], 'profile': self.profile.identifiant}},
+            {'op': 'create', 'type': 'skill', 'data': {'category': 'Batch', 'name': 'Compétence', 'level': 7, 'profile': self.profile.identifiant}},
+            {'op': 'delete', 'type': 'project', 'data': {'id': project_id}},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result['success'], True)
+        self.assertEqual(len(result['results']), 6)
+        self.assertEqual([r['op'] for r in result['results']], ['create', 'create', 'update', 'create', 'create', 'delete'])
+
+        # Les nouveaux éléments sont ajoutés à la suite des existants
+        abouts = list(About.objects.filter(profile=self.profile).order_by('order'))
+        self.assertEqual([about.content for about in abouts[-2:]], ['Nouveau 1', 'Nouveau 2'])
+        self.assertEqual(len({about.order for about in abouts}), len(abouts))
+        self.assertEqual(About.objects.get(id=about_id).content, 'Modifié')
+
+        experience = Experience.objects.get(id=result['results'][3]['id'])
+        self.assertEqual(list(experience.skills.all()), [self.skills[0]])
+
+        skill = Skill.objects.get(category='Batch', name='Compétence')
+        self.assertEqual(ProfileSkill.objects.get(profile=self.profile, skill=skill).level, 7)
+        self.assertFalse(Project.objects.filter(id=project_id).exists())
+
+        # Les données assemblées sont à jour
+        data = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}).json()
+        self.assertIn('Nouveau 2', [about['content'] for about in data['about']])
+        self.assertNotIn(project_id, [project['id'] for project in data['projects']])
+
+    def test_batch_rolled_back_on_error(self):
+        """Teste qu'une opération invalide annule tout le lot"""
+        response = self.post_batch([
+            {'op': 'create', 'type': 'about', 'data': {'content': 'Jamais enregistré', 'profile': self.profile.identifiant}},
+            {'op': 'update', 'type': 'about', 'data': {'id': 999999, 'content': 'Inexistant'}},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        result = response.json()
+        self.assertEqual(result['success'], False)
+        self.assertEqual(result['index'], 1)
+        self.assertFalse(About.objects.filter(content='Jamais enregistré').exists())
+
+    def test_batch_invalid_operation(self):
+        """Teste le refus d'un type d'élément inconnu"""
+        response = self.post_batch([{'op': 'create', 'type': 'unknown', 'data': {}}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 0)
+
+    def test_batch_applied_in_order(self):
+        """Teste que les opérations sont appliquées dans l'ordre du lot, comme envoyées une à une"""
+        about_id = self.abouts[0].id
+        project_id = self.projects[0].id
+
+        # Une mise à jour après une suppression échoue, comme si les opérations étaient envoyées une à une
+        response = self.post_batch([
+            {'op': 'delete', 'type': 'about', 'data': {'id': about_id}},
+            {'op': 'update', 'type': 'about', 'data': {'id': about_id, 'content': 'Trop tard'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertTrue(About.objects.filter(id=about_id).exists())
+
+        # Deux mises à jour successives : la dernière l'emporte, y compris pour les compétences
+        response = self.post_batch([
+            {'op': 'update', 'type': 'project', 'data': {'id': project_id, 'title': 'Premier', 'skills': [self.skills[0].id]}},
+            {'op': 'update', 'type': 'project', 'data': {'id': project_id, 'title': 'Second', 'skills': [self.skills[1].id]}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        project = Project.objects.get(id=project_id)
+        self.assertEqual(project.title, 'Second')
+        self.assertEqual(list(project.skills.all()), [self.skills[1]])
+
+        # Un profil créé puis renommé dans le même lot reçoit les éléments créés ensuite
+        response = self.post_batch([
+            {'op': 'create', 'type': 'profile', 'data': {'identifiant': 'lot', 'name': 'Lot', 'title': ''}},
+            {'op': 'create', 'type': 'about', 'data': {'content': 'Avant', 'profile': 'lot'}},
+        ])
+        profile_id = response.json()['results'][0]['id']
+        response = self.post_batch([
+            {'op': 'update', 'type': 'profile', 'data': {'id': profile_id, 'identifiant': 'lot-renomme'}},
+            {'op': 'create', 'type': 'about', 'data': {'content': 'Après', 'profile': 'lot-renomme'}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(About.objects.filter(profile_id=profile_id).order_by('order').values_list('content', flat=True)),
+            ['Avant', 'Après']
+        )
+
+    def test_batch_invalid_ids(self):
+        """Teste le refus (400) d'identifiants de compétences ou de niveaux invalides"""
+        project_id = self.projects[0].id
+        for data in (
+            {'id': project_id, 'skills': ['abc']},
+            {'id': project_id, 'skills': '12'},
+            {'id': project_id, 'skills': [999999]},
+        ):
+            response = self.post_batch([{'op': 'update', 'type': 'project', 'data': data}])
+            self.assertEqual(response.status_code, 400, data)
+            self.assertEqual(response.json()['index'], 0)
+
+        response = self.post_batch([
+            {'op': 'create', 'type': 'skill', 'data': {'category': 'Batch', 'name': 'Niveau', 'level': 'haut', 'profile': self.profile.identifiant}},
+        ])
+        self.assertEqual(response.status_code, 400)
+
+class ReorderTest(BaseTest):
+
+    def post_reorder(self, type, ids):
+        return self.client.post(reverse('reorder', args=[type]), {'ids': ids}, content_type='application/json')
+
+    def test_reorder(self):
+        """Teste la réécriture de l'ordre de tous les éléments d'une section"""
+        ids = list(About.objects.filter(profile=self.profile).order_by('order').values_list('id', flat=True))
+        ids.reverse()
+
+        response = self.post_reorder('about', ids)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['success'], True)
+        self.assertEqual(list(About.objects.filter(profile=self.profile).values_list('id', flat=True)), ids)
+
+        # L'ordre est pris en compte par load_data
+        data = self.client.get(reverse('load_data'), {'identifiant': self.profile.identifiant}).json()
+        self.assertEqual([about['id'] for about in data['about']], ids)
+
+    def test_reorder_other_profile(self):
+        """Teste le refus d'une liste mêlant les éléments de plusieurs profils"""
+        second_profile = Profile.objects.get(identifiant='second-profile')
+        other = About.objects.create(profile=second_profile, content='Autre profil')
+        ids = list(About.objects.filter(profile=self.profile).values_list('id', flat=True)) + [other.id]
+
+        response = self.post_reorder('about', ids)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['success'], False)
+
+    def test_reorder_incomplete(self):
+        """Teste le refus d'une liste incomplète"""
+        ids = list(Project.objects.filter(profile=self.profile).values_list('id', flat=True))[:-1]
+
+        response = self.post_reorder('project', ids)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_reorder_invalid_ids(self):
+        """Teste le refus d'IDs qui ne sont pas une liste d'entiers"""
+        ids = list(About.objects.filter(profile=self.profile).order_by('order').values_list('id', flat=True))
+        for invalid in (''.join(map(str, ids)), [str(id) for id in ids], [True] * len(ids), [float(id) for id in ids]):
+            response = self.post_reorder('about', invalid)
+            self.assertEqual(response.status_code, 400, invalid)
+        self.assertEqual(list(About.objects.filter(profile=self.profile).values_list('id', flat=True)), ids)
+
+    def test_reorder_unknown_type(self):
+        """Teste le refus d'un type non ordonné"""
+        response = self.post_reorder('skill', [self.skills[0].id])
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,86 @@
+from .snapshots import THEME_SECTIONS, skill_categories
+import math
+
+# Durée de conservation par le navigateur d'une feuille de style versionnée (?v=...)
+THEME_MAX_AGE = 60 * 60 * 24 * 365
+
+# Rôle des premières couleurs de la palette, les suivantes colorent les catégories de compétences
+TEXT_HIGHLIGHT, TEXT, BACKGROUND = range(3)
+CATEGORY_OFFSET = 3
+
+def js_round(value):
+    """Arrondi de Math.round (0.5 arrondi vers le haut)"""
+    return math.floor(value + 0.5)
+
+def rgb_to_hsl(red, green, blue):
+    """Teinte (degrés), saturation et luminosité (%) arrondies, comme color-convert rgb.hsl"""
+    r, g, b = red / 255, green / 255, blue / 255
+    low, high = min(r, g, b), max(r, g, b)
+    delta = high - low
+
+    if delta == 0:
+        hue = 0
+    elif high == r:
+        hue = (g - b) / delta
+    elif high == g:
+        hue = 2 + (b - r) / delta
+    else:
+        hue = 4 + (r - g) / delta
+    hue = min(hue * 60, 360)
+    if hue < 0:
+        hue += 360
+
+    lightness = (low + high) / 2
+    if delta == 0:
+        saturation = 0
+    elif lightness <= 0.5:
+        saturation = delta / (high + low)
+    else:
+        saturation = delta / (2 - high - low)
+
+    return js_round(hue), js_round(saturation * 100), js_round(lightness * 100)
+
+def css_string(value):
+    """Chaîne CSS entre guillemets (sélecteurs d'attribut)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\a ') + '"'
+
+def palette_color(color):
+    red, green, blue = color['red'], color['green'], color['blue']
+    hue, saturation, lightness = rgb_to_hsl(red, green, blue)
+    return {
+        'rgb': f'rgb({red}, {green}, {blue})',
+        'rgba': f'rgba({red}, {green}, {blue}, {color["transparency"] / 100:g})',
+        'opaque': f'rgba({red}, {green}, {blue}, 1)',
+        'hsl': f'{hue}, {saturation}%, {lightness}%',
+        'hue': hue,
+        'saturation': saturation,
+        'lightness': lightness,
+    }
+
+def theme_context(snapshot):
+    """Palette du profil calculée pour la feuille de style theme.css"""
+    palette = [palette_color(color) for color in snapshot.data['colors']]
+    role = lambda index: palette[index] if index < len(palette) else None
+
+    background = role(BACKGROUND)
+    glow = None
+    if background is not None:
+        # Halo suivant le pointeur : teinte du fond, saturation et luminosité doublées
+        glow = f"hsla({background['hue']}, {min(background['saturation'] * 2, 100)}%, {min(background['lightness'] * 2, 100)}%, 0.5)"
+
+    return {
+        'palette': palette,
+        'highlight': role(TEXT_HIGHLIGHT),
+        'text': role(TEXT),
+        'background': background,
+        'glow': glow,
+        'categories': [
+            {'selector': css_string(category['name']), 'color': palette[CATEGORY_OFFSET + category['color_index']]}
+            for category in skill_categories(snapshot)
+            if CATEGORY_OFFSET + category['color_index'] < len(palette)
+        ],
+    }
+
+def theme_version(snapshot):
+    """Version de la feuille de style : change avec les couleurs ou les catégories de compétences"""
+    return ''.join(snapshot.section_versions[section][:8] for section in THEME_SECTIONS)
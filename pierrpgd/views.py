@@ -1,160 +1,240 @@
 from django.shortcuts import render
-from django.http import JsonResponse, Http404
+from django.template.loader import render_to_string
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, Http404
+from django.db.models import Q
 from .models import Profile, About, Experience, Education, Project, Skill, ProfileSkill, Color
+from .cache import API, FORMAT_VERSIONS, LOAD_DATA, PORTFOLIO, PORTFOLIO_CACHE_TIMEOUT, SKILLS, THEME, aget_cached, aset_cached
+from .batch import Batch, BatchError
+from .pagination import PaginationError, akeyset_page, format_cursor, keyset_page, page_after, page_limit
+from .serializers import API_SECTIONS, alist, api_rows, format_api_rows, group_skill_ids, page_skill_links, serialize_profile
+from .snapshots import acurrent_snapshot, rebuild_snapshots, skill_categories, snapshot_data, snapshot_sections
+from .signals import skill_profile_ids, touch_profiles
+from .theme import THEME_MAX_AGE, theme_context, theme_version
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.utils.cache import get_conditional_response, patch_cache_control
 import json
 
-def portfolio(request, identifiant):
+def profile_etag(profile, namespace, resource=None):
+    """ETag fort d'une ressource dérivée d'un profil
+
+    La version du format de l'espace de noms (pierrpgd.cache) en fait partie : un déploiement
+    qui change le gabarit ou la forme des données invalide les copies des navigateurs. Pas de
+    Last-Modified, précis à la seconde seulement : la validation repose sur l'ETag.
+    """
+    resource = resource or namespace
+    return f'"{resource}-v{FORMAT_VERSIONS[namespace]}-{profile.id}-{profile.content_version}-{profile.updated_at.timestamp()}"'
+
+def not_modified(request, profile, namespace, resource=None):
+    """Renvoie une réponse 304 si le client possède déjà la version courante, None sinon"""
+    etag = profile_etag(profile, namespace, resource)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, profile, namespace, resource)
+    return response
+
+def set_validators(response, profile, namespace, resource=None):
+    response.headers['ETag'] = profile_etag(profile, namespace, resource)
+    # Le navigateur revalide systématiquement, la réponse 304 ne coûte qu'une requête
+    patch_cache_control(response, no_cache=True)
+    return response
+
+def portfolio_context(profile, snapshot, categories):
+    """Contexte de portfolio.html, construit à partir du snapshot du profil"""
+    sections = snapshot_sections(snapshot)
+    return {
+        'profile': profile,
+        'about': snapshot.data['about'],
+        'experience': sections['experience'],
+        'education': sections['education'],
+        'projects': sections['projects'],
+        'skill_categories': categories,
+        'theme_version': theme_version(snapshot),
+        # Chaque section est mise en cache selon l'empreinte de son contenu
+        'section_versions': snapshot.section_versions,
+        # Les fragments rendus par un gabarit antérieur au déploiement ne sont plus lus
+        'fragment_version': FORMAT_VERSIONS[PORTFOLIO],
+        'fragment_timeout': PORTFOLIO_CACHE_TIMEOUT,
+    }
+
+async def portfolio(request, identifiant):
     try:
-        # Récupérer le profil correspondant à l'identifiant
+        # Récupérer le profil correspondant à l'identifiant, avec ses données assemblées
         try:
-            profile = Profile.objects.get(identifiant=identifiant)
-            about = profile.about.all()
-            experience = profile.experience.all().prefetch_related('skills')
-            education = profile.education.all().prefetch_related('skills')
-            projects = profile.projects.all().prefetch_related('skills')
-            profile_skills = ProfileSkill.objects.filter(profile=profile).order_by('skill__category', '-level')
-            colors = Color.objects.filter(profile=profile)
-
-            skills_data = []
-            
-            for ps in profile_skills:
-                skills_data.append({
-                    'id': ps.skill.id,
-                    'category': ps.skill.category,
-                    'name': ps.skill.name,
-                    'level': ps.level
-                })
-
+            profile = await Profile.objects.select_related('snapshot').aget(identifiant=identifiant)
         except Profile.DoesNotExist:
             raise Http404("Le profil demandé n'existe pas")
 
-        context = {
-            'profile': profile,
-            'about': about,
-            'experience': experience,
-            'education': education,
-            'projects': projects,
-            'skills': skills_data,
-            'colors': colors,
-        }
+        response = not_modified(request, profile, PORTFOLIO)
+        if response is not None:
+            return response
+
+        # Page déjà rendue pour cette version du profil
+        content = await aget_cached(PORTFOLIO, profile)
+        if content is not None:
+            return set_validators(HttpResponse(content), profile, PORTFOLIO)
+
+        snapshot = await acurrent_snapshot(profile)
+        # Compétences déjà regroupées par catégorie, jauges calculées
+        categories = await aget_cached(SKILLS, profile)
+        if categories is None:
+            categories = skill_categories(snapshot)
+            await aset_cached(SKILLS, profile, categories)
+
+        context = portfolio_context(profile, snapshot, categories)
         
-        return render(request, 'portfolio.html', context)
+        response = render(request, 'portfolio.html', context)
+        await aset_cached(PORTFOLIO, profile, response.content)
+        return set_validators(response, profile, PORTFOLIO)
     
     except Exception as e:
         raise
 
-def data_display(request):
-    """Vue pour afficher toutes les données de la base"""
+async def theme_css(request, identifiant):
+    """Feuille de style des couleurs du profil, mise en cache par le navigateur"""
+    try:
+        profile = await Profile.objects.select_related('snapshot').aget(identifiant=identifiant)
+    except Profile.DoesNotExist:
+        raise Http404("Le profil demandé n'existe pas")
+
+    snapshot = await acurrent_snapshot(profile)
+    version = theme_version(snapshot)
+    etag = f'"theme-{profile.id}-{version}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content = await aget_cached(THEME, profile)
+        if content is None:
+            content = render_to_string('theme.css', theme_context(snapshot))
+            await aset_cached(THEME, profile, content)
+        response = HttpResponse(content, content_type='text/css; charset=utf-8')
+
+    response.headers['ETag'] = etag
+    if request.GET.get('v') == version:
+        # L'URL versionnée par la page change avec le thème : son contenu est immuable
+        patch_cache_control(response, public=True, max_age=THEME_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+def profile_listing(params):
+    """Page de la liste des profils, filtrée par préfixe de l'identifiant ou du nom (paramètre q)"""
+    query = params.get('q', '').strip()
     profiles = Profile.objects.all()
+    if query:
+        profiles = profiles.filter(Q(identifiant__istartswith=query) | Q(name__istartswith=query))
+    page, next_after = keyset_page(profiles, page_after(params.get('after')), page_limit(params.get('limit')))
+    return query, page, next_after
+
+def data_display(request):
+    """Vue pour afficher les données de la base, les profils étant chargés page par page"""
+    try:
+        query, profiles, next_after = profile_listing(request.GET)
+    except PaginationError as e:
+        return HttpResponseBadRequest(str(e))
     context = {
         'profiles': profiles,
+        'query': query,
+        'next_after': next_after,
     }
     return render(request, 'data_display.html', context)
 
-def load_data(request):
+@require_http_methods(["GET"])
+def list_profiles(request):
+    """Page suivante de la liste des profils au format JSON (défilement du tableau de data_display)"""
+    try:
+        query, profiles, next_after = profile_listing(request.GET)
+    except PaginationError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'profiles': [serialize_profile(profile) for profile in profiles],
+        'next': next_after,
+    })
+
+async def load_data(request):
     """Vue pour charger les données liées à un profil spécifique"""
     if request.method == 'GET':
         identifiant = request.GET.get('identifiant')
         if identifiant:
             try:
-                profile = Profile.objects.get(identifiant=identifiant)
-                abouts = profile.about.all()
-                experiences = profile.experience.all()
-                educations = profile.education.all()
-                projects = profile.projects.all()
-                profile_skills = ProfileSkill.objects.filter(profile=profile)
-                colors = Color.objects.filter(profile=profile).order_by('order')
-                
-                # Récupération de toutes les compétences liées au profil
-                skills_data = []
-                
-                for ps in profile_skills:
-                    skills_data.append({
-                        'id': ps.skill.id,
-                        'category': ps.skill.category,
-                        'name': ps.skill.name,
-                        'level': ps.level
-                    })
-                
-                data = {
-                    'profile': {
-                        'name': profile.name if profile.name else '',
-                        'identifiant': profile.identifiant,
-                        'title': profile.title if profile.title else '',
-                        'id': profile.id,
-                        'created_at': profile.created_at,
-                        'updated_at': profile.updated_at,
-                    },
-                    'about': [
-                        {
-                            'id': about.id,
-                            'order': about.order,
-                            'content': about.content if about.content else ''
-                        } for about in abouts
-                    ],
-                    'experience': [
-                        {
-                            'id': exp.id,
-                            'order': exp.order,
-                            'dates': exp.dates if exp.dates else '',
-                            'position': exp.position if exp.position else '',
-                            'company': exp.company if exp.company else '',
-                            'location': exp.location if exp.location else '',
-                            'description': exp.description if exp.description else '',
-                            'details': exp.details if exp.details else '',
-                            'url': exp.url if exp.url else '',
-                            'skills': [skill.id for skill in exp.skills.all()]
-                        } for exp in experiences
-                    ],
-                    'education': [
-                        {
-                            'id': edu.id,
-                            'order': edu.order,
-                            'dates': edu.dates if edu.dates else '',
-                            'institution': edu.institution if edu.institution else '',
-                            'location': edu.location if edu.location else '',
-                            'title': edu.title if edu.title else '',
-                            'field': edu.field if edu.field else '',
-                            'description': edu.description if edu.description else '',
-                            'details': edu.details if edu.details else '',
-                            'url': edu.url if edu.url else '',
-                            'skills': [skill.id for skill in edu.skills.all()]
-                        } for edu in educations
-                    ],
-                    'projects': [
-                        {
-                            'id': project.id,
-                            'order': project.order,
-                            'title': project.title if project.title else '',
-                            'image_url': project.image_url if project.image_url else '',
-                            'description': project.description if project.description else '',
-                            'details': project.details if project.details else '',
-                            'url': project.url if project.url else '',
-                            'skills': [skill.id for skill in project.skills.all()]
-                        } for project in projects
-                    ],
-                    'colors': [
-                        {
-                            'id': color.id,
-                            'order': color.order,
-                            'red': color.red,
-                            'green': color.green,
-                            'blue': color.blue,
-                            'transparency': color.transparency,
-                            'profile': color.profile.id
-                        } for color in colors
-                    ],
-                    'skills': skills_data
-                }
-                
-                return JsonResponse(data)
+                profile = await Profile.objects.select_related('snapshot').aget(identifiant=identifiant)
+
+                response = not_modified(request, profile, LOAD_DATA)
+                if response is not None:
+                    return response
+
+                # Données déjà sérialisées pour cette version du profil
+                content = await aget_cached(LOAD_DATA, profile)
+                if content is None:
+                    data = snapshot_data(profile, await acurrent_snapshot(profile))
+                    content = JsonResponse(data).content
+                    await aset_cached(LOAD_DATA, profile, content)
+
+                return set_validators(HttpResponse(content, content_type='application/json'), profile, LOAD_DATA)
             except Profile.DoesNotExist:
                 return JsonResponse({'error': 'Profil non trouvé'}, status=404)
     return JsonResponse({'error': 'Aucun profil sélectionné'}, status=400)
 
+def requested_fields(section, value):
+    """Champs demandés par le paramètre fields (séparés par des virgules), tous par défaut"""
+    _, fields, with_skills, _ = API_SECTIONS[section]
+    available = fields + (('skills',) if with_skills else ())
+    if not value:
+        return available, []
+    # L'identifiant et l'ordre sont toujours renvoyés : acceptés dans fields, puis ignorés
+    always = ('id',) if section == 'skills' else ('id', 'order')
+    requested = [field.strip() for field in value.split(',') if field.strip() and field.strip() not in always]
+    return list(dict.fromkeys(requested)), [field for field in requested if field not in available]
+
+async def section_api(request, identifiant, section):
+    """Éléments d'une section d'un profil, page par page (paramètres after, limit et fields)"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Méthode non autorisée'}, status=405)
+    if section not in API_SECTIONS:
+        return JsonResponse({'error': 'Section inconnue'}, status=404)
+
+    try:
+        profile = await Profile.objects.aget(identifiant=identifiant)
+    except Profile.DoesNotExist:
+        return JsonResponse({'error': 'Profil non trouvé'}, status=404)
+
+    fields, unknown = requested_fields(section, request.GET.get('fields'))
+    if unknown:
+        return JsonResponse({'error': f"Champs inconnus : {', '.join(unknown)}"}, status=400)
+
+    model, _, _, keys = API_SECTIONS[section]
+    try:
+        after = page_after(request.GET.get('after'), len(keys))
+        limit = page_limit(request.GET.get('limit'))
+    except PaginationError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Validateurs propres à la page demandée (paramètres normalisés) : deux pages ne partagent pas d'ETag
+    # (pas de virgule, séparateur des ETags de If-None-Match)
+    cursor = format_cursor(after) if after is not None else ''
+    resource = f"api-{section}-{'+'.join(fields)}-{cursor}-{limit}"
+    response = not_modified(request, profile, API, resource)
+    if response is not None:
+        return response
+
+    columns = [field for field in fields if field != 'skills']
+    rows, next_after = await akeyset_page(api_rows(section, profile, columns), after, limit, keys)
+
+    # Compétences des seuls éléments de la page, si elles sont demandées
+    skill_ids = None
+    if 'skills' in fields:
+        skill_ids = group_skill_ids(await alist(page_skill_links(model, [row['id'] for row in rows])))
+
+    data = {
+        'section': section,
+        'items': format_api_rows(section, rows, fields, skill_ids),
+        'next': next_after,
+    }
+    return set_validators(JsonResponse(data), profile, API, resource)
+
 @csrf_exempt
+@transaction.atomic
 def save_data(request):
     if request.method == 'POST':
         try:
@@ -326,6 +406,15 @@ def save_data(request):
 
             if obj:
                 obj.save()
+
+                # Reconstruire les données assemblées des profils concernés
+                if type == 'profile':
+                    rebuild_snapshots([obj.id])
+                elif type == 'skill':
+                    rebuild_snapshots(skill_profile_ids(obj))
+                else:
+                    rebuild_snapshots([obj.profile_id])
+
                 data = {
                     field.name: getattr(obj, field.name).id if field.name == 'profile' else getattr(obj, field.name)
                     for field in obj._meta.fields
@@ -336,6 +425,7 @@ def save_data(request):
             return JsonResponse({'success': False, 'error': 'Données JSON invalides'}, status=400)
             
         except Exception as e:
+            transaction.set_rollback(True)
             return JsonResponse({
                 'success': False, 
                 'error': str(e)
@@ -343,7 +433,85 @@ def save_data(request):
     
     return JsonResponse({'success': False, 'error': 'Méthode non autorisée'}, status=405)
 
+@csrf_exempt
+@transaction.atomic
+def save_batch(request):
+    """Applique une liste d'opérations (create/update/delete) dans une seule transaction"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            operations = data.get('operations') if isinstance(data, dict) else None
+            results = Batch(operations).run()
+            return JsonResponse({'success': True, 'results': results})
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'error': 'Données JSON invalides'}, status=400)
+
+        except BatchError as e:
+            transaction.set_rollback(True)
+            return JsonResponse({'success': False, 'index': e.index, 'error': str(e)}, status=400)
+
+        except Exception as e:
+            transaction.set_rollback(True)
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=500)
+
+    return JsonResponse({'success': False, 'error': 'Méthode non autorisée'}, status=405)
+
+# Éléments ordonnés au sein d'un profil
+ORDERED_MODELS = {
+    'about': About,
+    'experience': Experience,
+    'education': Education,
+    'project': Project,
+    'color': Color,
+}
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@transaction.atomic
+def reorder(request, type):
+    """Réécrit l'ordre de tous les éléments d'une section à partir de la liste ordonnée de leurs IDs"""
+    model = ORDERED_MODELS.get(type)
+    if model is None:
+        return JsonResponse({'success': False, 'error': 'Type inconnu'}, status=400)
+
+    try:
+        ids = json.loads(request.body).get('ids', [])
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Données JSON invalides'}, status=400)
+    # Entiers JSON uniquement : une chaîne serait lue caractère par caractère, un booléen comme 0 ou 1
+    if not isinstance(ids, list) or not all(isinstance(id, int) and not isinstance(id, bool) for id in ids):
+        return JsonResponse({'success': False, 'error': 'Liste d\'IDs invalide'}, status=400)
+    if not ids or len(set(ids)) != len(ids):
+        return JsonResponse({'success': False, 'error': 'Liste d\'IDs invalide'}, status=400)
+
+    items = model.objects.in_bulk(ids)
+    if len(items) != len(ids):
+        return JsonResponse({'success': False, 'error': f'{type} not found'}, status=404)
+
+    # Tous les éléments de la section du profil doivent être fournis
+    profile_ids = {item.profile_id for item in items.values()}
+    if len(profile_ids) != 1:
+        return JsonResponse({'success': False, 'error': 'Les éléments doivent appartenir au même profil'}, status=400)
+    profile_id = profile_ids.pop()
+    if model.objects.filter(profile_id=profile_id).count() != len(ids):
+        return JsonResponse({'success': False, 'error': 'Liste d\'IDs incomplète'}, status=400)
+
+    for order, id in enumerate(ids):
+        items[id].order = order
+    model.objects.bulk_update(list(items.values()), ['order'])
+
+    # bulk_update ne déclenche pas les signaux
+    touch_profiles([profile_id])
+    rebuild_snapshots([profile_id])
+
+    return JsonResponse({'success': True, 'type': type, 'ids': ids})
+
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_profile(request, profile_id):
     try:
         profile = Profile.objects.get(id=profile_id)
@@ -353,51 +521,67 @@ def delete_profile(request, profile_id):
         return JsonResponse({'success': False, 'error': 'Profile not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_color(request, color_id):
     try:
         color = Color.objects.get(id=color_id)
         color.delete()
+        touch_profiles([color.profile_id])
+        rebuild_snapshots([color.profile_id])
         return JsonResponse({'success': True})
     except Color.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Color not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_about(request, about_id):
     try:
         about = About.objects.get(id=about_id)
         about.delete()
+        touch_profiles([about.profile_id])
+        rebuild_snapshots([about.profile_id])
         return JsonResponse({'success': True})
     except About.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'About not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_experience(request, experience_id):
     try:
         experience = Experience.objects.get(id=experience_id)
         experience.delete()
+        touch_profiles([experience.profile_id])
+        rebuild_snapshots([experience.profile_id])
         return JsonResponse({'success': True})
     except Experience.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Experience not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_education(request, education_id):
     try:
         education = Education.objects.get(id=education_id)
         education.delete()
+        touch_profiles([education.profile_id])
+        rebuild_snapshots([education.profile_id])
         return JsonResponse({'success': True})
     except Education.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Education not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_project(request, project_id):
     try:
         project = Project.objects.get(id=project_id)
         project.delete()
+        touch_profiles([project.profile_id])
+        rebuild_snapshots([project.profile_id])
         return JsonResponse({'success': True})
     except Project.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Project not found'}, status=404)
 
 @require_http_methods(["DELETE"])
+@transaction.atomic
 def delete_skill(request, profile_identifiant, skill_id):
     try:
         skill = Skill.objects.get(id=skill_id)
@@ -415,6 +599,8 @@ def delete_skill(request, profile_identifiant, skill_id):
         projects = Project.objects.filter(profile=profile)
         for project in projects:
             project.skills.remove(skill)
+
+        rebuild_snapshots([profile.id])
         
         return JsonResponse({'success': True})
     except Skill.DoesNotExist:
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolios.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings
+
+if getattr(settings, 'PIERRPGD_WARM_TEMPLATES', False):
+    # Chaque processus compile ses gabarits avant sa première requête
+    from pierrpgd.templating import warm_templates
+    warm_templates()
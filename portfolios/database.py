@@ -0,0 +1,62 @@
+"""
+Réglage des connexions aux bases de données du projet portfolios.
+
+Les réglages appellent ``configure_database`` sur chaque entrée de ``DATABASES``.
+Les connexions SQLite reçoivent ensuite le réglage ``SQLITE_PRAGMAS`` à leur ouverture.
+"""
+
+import os
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# PRAGMA exécutés à l'ouverture de chaque connexion SQLite (remplaçables par le réglage SQLITE_PRAGMAS)
+SQLITE_PRAGMAS = {
+    # Les lectures ne sont plus bloquées par une écriture en cours
+    'journal_mode': 'wal',
+    # En WAL, NORMAL reste cohérent après un crash et évite une synchronisation disque par transaction
+    'synchronous': 'normal',
+    # Lecture du fichier par projection mémoire (128 Mio)
+    'mmap_size': 128 * 1024 * 1024,
+    # Cache de pages par connexion, en Kio lorsque la valeur est négative (64 Mio)
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return value.lower() in ('1', 'true', 'yes') if value else default
+
+def configure_database(config):
+    """Complète la configuration d'une base selon son moteur et les variables d'environnement
+
+    DB_CONN_MAX_AGE : durée de vie des connexions persistantes, en secondes.
+    DB_SERVER_SIDE_CURSORS : curseurs côté serveur pour .iterator() (PostgreSQL),
+    à désactiver derrière un pooler en mode transaction (PgBouncer).
+    SQLITE_BUSY_TIMEOUT : attente maximale d'un verrou d'écriture, en secondes.
+    """
+    engine = config.get('ENGINE', '')
+    if 'postgresql' in engine:
+        config['CONN_MAX_AGE'] = env_int('DB_CONN_MAX_AGE', config.get('CONN_MAX_AGE') or 600)
+        # Une connexion persistante coupée par le serveur est remplacée au lieu de faire échouer la requête
+        config['CONN_HEALTH_CHECKS'] = True
+        config['DISABLE_SERVER_SIDE_CURSORS'] = not env_bool('DB_SERVER_SIDE_CURSORS', True)
+    elif 'sqlite3' in engine:
+        config['CONN_MAX_AGE'] = env_int('DB_CONN_MAX_AGE', config.get('CONN_MAX_AGE') or 0)
+        config['CONN_HEALTH_CHECKS'] = config['CONN_MAX_AGE'] > 0
+        config.setdefault('OPTIONS', {})['timeout'] = env_int('SQLITE_BUSY_TIMEOUT', 20)
+    return config
+
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', SQLITE_PRAGMAS)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+connection_created.connect(set_sqlite_pragmas, dispatch_uid='portfolios.database.set_sqlite_pragmas')
@@ -0,0 +1,77 @@
+"""
+Routage des lectures vers la réplique du projet portfolios.
+
+``ReplicaMiddleware`` marque les requêtes servies par les vues en lecture seule du
+réglage ``REPLICA_READ_VIEWS``. ``ReplicaRouter`` envoie leurs lectures vers l'alias
+``replica``, s'il est configuré, jusqu'à la première écriture : les écritures vont
+toujours vers la base principale, comme les lectures qui les suivent.
+"""
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import Resolver404, resolve
+
+REPLICA_DB_ALIAS = 'replica'
+
+# État de la requête en cours : un dictionnaire partagé, modifié sur place par le routeur
+# (les appels ORM des vues asynchrones s'exécutent dans une copie du contexte)
+request_state = ContextVar('replica_request_state', default=None)
+
+def is_read_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    return match.url_name in getattr(settings, 'REPLICA_READ_VIEWS', ())
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = request_state.set({'use_replica': is_read_request(request)})
+        try:
+            return self.get_response(request)
+        finally:
+            request_state.reset(token)
+
+    async def __acall__(self, request):
+        token = request_state.set({'use_replica': is_read_request(request)})
+        try:
+            return await self.get_response(request)
+        finally:
+            request_state.reset(token)
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = request_state.get()
+        if state is not None and state['use_replica'] and REPLICA_DB_ALIAS in settings.DATABASES:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = request_state.get()
+        if state is not None:
+            # Lire ce qui vient d'être écrit : la réplique peut être en retard
+            state['use_replica'] = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplique contient les mêmes données que la base principale
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplique reçoit le schéma par réplication
+        return db != REPLICA_DB_ALIAS
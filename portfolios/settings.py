@@ -11,9 +11,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 import os
 
+from .database import SQLITE_PRAGMAS, configure_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,13 +45,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'mathfilters',
     'pierrpgd',
     'bootstrap5',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'portfolios.replica.ReplicaMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,8 +83,22 @@ WSGI_APPLICATION = 'portfolios.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Compiler les gabarits de l'application au démarrage de chaque processus (voir portfolios/asgi.py)
+PIERRPGD_WARM_TEMPLATES = False
+
 if os.environ.get('RENDER', None) == 'true':
-    Debug = False
+    DEBUG = False
+
+    # Chargeur mis en cache déclaré explicitement : Django l'active déjà par défaut (depuis 4.1, DEBUG
+    # compris), la production ne dépend ainsi ni de ce défaut ni d'un futur réglage OPTIONS['loaders']
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    PIERRPGD_WARM_TEMPLATES = True
 
     DATABASES = {
         'default': dj_database_url.config(
@@ -103,6 +120,54 @@ else:
         }
     }
 
+# Réplique en lecture facultative, par exemple postgres://... ou sqlite:////chemin/replica.sqlite3 en local
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = dj_database_url.parse(os.environ['DATABASE_REPLICA_URL'], conn_max_age=600)
+    # Les tests lisent la réplique à travers la connexion principale
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Lectures des vues publiques sur la réplique, écritures (et lectures qui les suivent) sur la base principale
+DATABASE_ROUTERS = ['portfolios.replica.ReplicaRouter']
+# Noms d'URL des vues en lecture seule servies par la réplique (seule liste, lue par portfolios/replica.py)
+REPLICA_READ_VIEWS = ['portfolio', 'theme_css', 'load_data', 'data_display', 'list_profiles', 'section_api']
+
+# Connexions persistantes, health checks, curseurs côté serveur (PostgreSQL) et attente des verrous (SQLite)
+for database in DATABASES.values():
+    configure_database(database)
+
+# PRAGMA appliqués à chaque connexion SQLite : WAL, synchronous=NORMAL, mmap et cache de pages
+SQLITE_PRAGMAS = dict(SQLITE_PRAGMAS)
+
+# Cache : CACHE_BACKEND=locmem (défaut, par processus), file (partagé entre les processus d'une machine)
+# ou redis (CACHE_URL, nécessite le paquet redis)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolios',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / '.cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379'),
+    },
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}")
+
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        # Clés de l'application : pierrpgd:<portfolio|load_data|skills|theme>:v<format>:<identifiant>:<version>
+        'KEY_PREFIX': 'portfolios',
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 